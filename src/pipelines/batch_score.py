@@ -1,132 +1,376 @@
-"""Batch Score Artifacts
-
-This script performs batch scoring on a dataset using a pre-trained model.
-It includes functions to load data, preprocess it, score it, and save the results.
-
-Dependencies:
-- sys
-- pathlib.Path
-- src.datapull.data_pull.load_data
-- src.preprocess.pre_process.prepare_data
-- src.utils._config.get_argv_config
-- src.utils._config.get_pickle
-"""
-
-import os
-from typing import Any
-
-import pandas as pd
-
-from pipelines.data_pull import load_data
-from pipelines.post_process import publish_data
-from pipelines.pre_process import prepare_data
-from utils._config import (
-    get_argv_config,
-    load_env_file,
-    load_model_by_alias,
-    parse_args,
-)
-
-
-def score_model(
-    model: Any,
-    wind_speed: float,
-    theoretical_power: float,
-    wind_direction: float,
-    month: int,
-    hour: int,
-) -> float:
-    """Score a single set of inputs using the loaded model.
-
-    Args:
-        model (Any): The machine learning model used for prediction.
-        wind_speed (float): The wind speed value.
-        theoretical_power (float): The theoretical power curve value.
-        wind_direction (float): The wind direction value.
-        month (int): The month of the observation.
-        hour (int): The hour of the observation.
-
-    Returns:
-        float: The predicted value from the model.
-    """
-    # return model.predict([[wind_speed, theoretical_power, wind_direction, month, hour]])[0]
-    # Creating a DataFrame with named columns for the model input
-    input_df = pd.DataFrame(
-        [
-            {
-                "Wind Speed (m/s)": wind_speed,
-                "Theoretical_Power_Curve (KWh)": theoretical_power,
-                "Wind Direction (°)": wind_direction,
-                "Month": month,
-                "Hour": hour,
-            }
-        ]
-    )
-    return model.predict(input_df)[0]
-
-
-def batch_score(df: pd.DataFrame, model: Any) -> pd.DataFrame:
-    """Apply batch scoring to the dataset using the provided model.
-
-    Args:
-        df (pd.DataFrame): The input DataFrame containing features for scoring.
-        model (Any): The machine learning model used for batch scoring.
-
-    Returns:
-        pd.DataFrame: The DataFrame with an additional column for the predicted scores.
-    """
-    df["score"] = df.apply(
-        lambda row: score_model(
-            model,
-            row["Wind Speed (m/s)"],
-            row["Theoretical_Power_Curve (KWh)"],
-            row["Wind Direction (°)"],
-            row["Month"],
-            row["Hour"],
-        ),
-        axis=1,
-    )
-    return df
-
-
-def main() -> None:
-    """Main function to load model, score data, and save results.
-
-    This function:
-    1. Loads the configuration.
-    2. Loads the pre-trained model.
-    3. Loads and preprocesses the test data.
-    4. Scores the data using the model.
-    5. Performs the post processing.
-    """
-    config = get_argv_config()
-    files_config = config["Files"]
-    mlflow_config = config["MLflow"]
-
-    # Parse arguments
-    args = parse_args()
-
-    # Load the environment variables from the .env file
-    load_env_file(args.env)
-
-    # Access the environment variables
-    bucket_name = os.getenv("s3_bucket")
-
-    model = load_model_by_alias(mlflow_config["registered_model_name"], "champion")
-    print("Model loaded successfully from MLflow Server...")
-
-    # Load the test data from S3 or local files
-    df = load_data(files_config["test_data"], bucket_name)
-
-    # Preprocess the data for scoring
-    df = prepare_data(df, mode="score")
-
-    # Score the data using the model
-    scored_df = batch_score(df, model)
-
-    # Perform the post-processing and save the results
-    publish_data(scored_df, bucket_name)
-
-
-if __name__ == "__main__":
-    main()
+"""Batch Score Artifacts
+
+This script performs batch scoring on a dataset using a pre-trained model.
+It includes functions to load data, preprocess it, score it, and save the results.
+
+Dependencies:
+- sys
+- pathlib.Path
+- src.datapull.data_pull.load_data
+- src.preprocess.pre_process.prepare_data
+- src.utils._config.get_argv_config
+- src.utils._config.get_pickle
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import mlflow
+import numpy as np
+import pandas as pd
+
+from pipelines.data_pull import load_new_data
+from pipelines.drift import build_sketch, drift_statistics, load_training_sketch
+from pipelines.experiment import (
+    model_outlier_bounds,
+    model_window_features,
+    setup_mlflow_experiment,
+)
+from pipelines.feature_store import load_features
+from pipelines.post_process import publish_data
+from pipelines.pre_process import feature_columns, prepare_data
+from pipelines.surrogate import load_surrogate, surrogate_or_model
+from pipelines.validation import DataValidator
+from pipelines.watermark import read_watermark_state, write_watermark
+from pipelines.window_features import WindowState
+from utils._config import (
+    get_argv_config,
+    load_env_file,
+    load_model_by_alias,
+    load_model_by_version,
+    parse_args,
+)
+from utils._registry import RegistryClient
+
+
+def score_model(
+    model: Any,
+    wind_speed: float,
+    theoretical_power: float,
+    wind_direction: float,
+    month: int,
+    hour: int,
+) -> float:
+    """Score a single set of inputs using the loaded model.
+
+    Args:
+        model (Any): The machine learning model used for prediction.
+        wind_speed (float): The wind speed value.
+        theoretical_power (float): The theoretical power curve value.
+        wind_direction (float): The wind direction value.
+        month (int): The month of the observation.
+        hour (int): The hour of the observation.
+
+    Returns:
+        float: The predicted value from the model.
+    """
+    # return model.predict([[wind_speed, theoretical_power, wind_direction, month, hour]])[0]
+    # Creating a DataFrame with named columns for the model input
+    input_df = pd.DataFrame(
+        [
+            {
+                "Wind Speed (m/s)": wind_speed,
+                "Theoretical_Power_Curve (KWh)": theoretical_power,
+                "Wind Direction (°)": wind_direction,
+                "Month": month,
+                "Hour": hour,
+            }
+        ]
+    )
+    return model.predict(input_df)[0]
+
+
+def build_feature_matrix(df: pd.DataFrame, window_features: bool = False) -> pd.DataFrame:
+    """Select the model input columns once so they can be shared between models.
+
+    Args:
+        df (pd.DataFrame): The prepared DataFrame.
+        window_features (bool): Whether to include the lag and rolling wind features.
+
+    Returns:
+        pd.DataFrame: The feature matrix in the column order the model expects.
+    """
+    return df[feature_columns(window_features)]
+
+
+def select_model_features(features: pd.DataFrame, window_features: bool) -> pd.DataFrame:
+    """Return the columns of a shared feature matrix that one model takes.
+
+    Args:
+        features (pd.DataFrame): The shared feature matrix.
+        window_features (bool): Whether the model takes the lag and rolling wind features.
+
+    Returns:
+        pd.DataFrame: The model's feature matrix, `features` itself when it matches.
+    """
+    columns = feature_columns(window_features)
+    return features if list(features.columns) == columns else features[columns]
+
+
+def batch_score(
+    df: pd.DataFrame,
+    model: Any,
+    features: Optional[pd.DataFrame] = None,
+    window_features: bool = False,
+) -> pd.DataFrame:
+    """Apply batch scoring to the dataset using the provided model.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame containing features for scoring.
+        model (Any): The machine learning model used for batch scoring.
+        features (Optional[pd.DataFrame]): A prebuilt feature matrix for `df`.
+                                           Built from `df` when not given.
+        window_features (bool): Whether the model takes the lag and rolling wind features.
+
+    Returns:
+        pd.DataFrame: The DataFrame with an additional column for the predicted scores.
+    """
+    if features is None:
+        features = build_feature_matrix(df, window_features)
+    df["score"] = model.predict(features)
+    return df
+
+
+def shadow_score(
+    df: pd.DataFrame,
+    champion: Any,
+    challenger: Any,
+    champion_window_features: bool = False,
+    challenger_window_features: bool = False,
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """Score the champion and challenger models in a single pass over the data.
+
+    The feature matrix is built once and shared by both models; each model
+    takes the columns of the feature set it was trained on. The champion
+    prediction stays in `score`, the challenger prediction is added as
+    `challenger_score` and their per-row difference as `score_diff`.
+
+    Args:
+        df (pd.DataFrame): The prepared DataFrame to score.
+        champion (Any): The production model.
+        challenger (Any): The shadow model.
+        champion_window_features (bool): Whether the champion takes the window features.
+        challenger_window_features (bool): Whether the challenger takes the window features.
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, float]]: The scored DataFrame and the
+          summary divergence metrics between the two models.
+    """
+    features = build_feature_matrix(df, champion_window_features or challenger_window_features)
+    df = batch_score(df, champion, select_model_features(features, champion_window_features))
+    df["challenger_score"] = challenger.predict(
+        select_model_features(features, challenger_window_features)
+    )
+    df["score_diff"] = df["challenger_score"] - df["score"]
+
+    abs_diff = df["score_diff"].abs()
+    divergence = {
+        "shadow_rows": float(len(df)),
+        "shadow_mean_diff": float(df["score_diff"].mean()),
+        "shadow_mean_abs_diff": float(abs_diff.mean()),
+        "shadow_max_abs_diff": float(abs_diff.max()),
+        "shadow_rmse_diff": float(np.sqrt((df["score_diff"] ** 2).mean())),
+    }
+    return df, divergence
+
+
+def resolve_shadow_version(registry: RegistryClient, alias: str) -> Optional[str]:
+    """Return the model version behind the shadow alias, if the alias is set.
+
+    The promotion step after training removes the 'challenger' alias, so the
+    shadow alias can be missing; scoring then continues with the champion only.
+
+    Args:
+        registry (RegistryClient): The registry of the scored model.
+        alias (str): The alias of the model to score in shadow.
+
+    Returns:
+        Optional[str]: The shadow model version, or None if the alias is not set.
+    """
+    version = registry.version_by_alias(alias)
+    if version is None:
+        print(
+            f"No '{alias}' version found for model '{registry.model_name}'; "
+            "scoring the champion only."
+        )
+    return version
+
+
+def main() -> None:
+    """Main function to load model, score data, and save results.
+
+    This function:
+    1. Loads the configuration.
+    2. Loads and validates the test data (only rows past the watermark in incremental mode).
+    3. Loads the pre-trained model.
+    4. Scores the data using the model, optionally shadowed by a second registered model.
+    5. Optionally logs drift statistics against the champion's training sketch.
+    6. Performs the post processing and advances the watermark.
+    """
+    config = get_argv_config()
+    files_config = config["Files"]
+    mlflow_config = config["MLflow"]
+    scoring_config = config["Scoring"]
+
+    # Parse arguments
+    args = parse_args()
+
+    # Load the environment variables from the .env file
+    load_env_file(args.env)
+
+    # Access the environment variables
+    bucket_name = os.getenv("s3_bucket")
+    MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI")
+
+    source = files_config["test_data"]
+    incremental = scoring_config.getboolean("incremental", fallback=False)
+    watermark_store = scoring_config.get("watermark_store", fallback="s3")
+    shadow = scoring_config.getboolean("shadow", fallback=False)
+    drift = scoring_config.getboolean("drift", fallback=False)
+    validator = DataValidator(
+        mode="score",
+        policy=config["Validation"].get("policy", fallback="fail"),
+        bucket_name=bucket_name,
+        source=source,
+        chunksize=config["Validation"].getint("chunksize", fallback=1_000_000),
+    )
+
+    # Each model is scored on the feature set recorded with its version; the window
+    # features are prepared when either the champion or the shadow model takes them
+    model_name = mlflow_config["registered_model_name"]
+    registry = RegistryClient(model_name)
+    champion_version = registry.version_by_alias("champion")
+    champion_window = model_window_features(registry, champion_version)
+    shadow_version = None
+    if shadow:
+        shadow_version = resolve_shadow_version(
+            registry, scoring_config.get("shadow_alias", "archived")
+        )
+    shadow_window = shadow_version is not None and model_window_features(registry, shadow_version)
+    window_features = champion_window or shadow_window
+
+    # Drop wind speed outliers with the fixed bounds of the champion's training data, so
+    # the rows kept do not depend on how the data is split into incremental runs
+    outlier_bounds = model_outlier_bounds(registry, champion_version)
+    if outlier_bounds is None:
+        print("No outlier bounds recorded with the champion; computing them on the scored rows.")
+
+    if incremental:
+        # Only read the rows newer than the last scored Date/Time
+        state = read_watermark_state(source, bucket_name, watermark_store)
+        watermark = pd.Timestamp(state["watermark"]) if state.get("watermark") else None
+        df, source_position = load_new_data(
+            source, bucket_name, watermark, position=state.get("source_position")
+        )
+        if df.empty:
+            print("No new rows to score since the last run.")
+            return
+        new_rows = df
+        df = validator(new_rows)
+        if df.empty:
+            # Record the rejected rows as read, so the next run does not validate and
+            # quarantine them again (the validator parsed their Date/Time in place)
+            print("No valid new rows to score since the last run.")
+            rejected_watermark = new_rows["Date/Time"].max()
+            write_watermark(
+                source,
+                watermark if pd.isna(rejected_watermark) else rejected_watermark,
+                bucket_name,
+                watermark_store,
+                rows_scored=0,
+                window_state=state.get("window_state"),
+                source_position=source_position,
+            )
+            return
+        new_watermark = df["Date/Time"].max()
+
+        # Preprocess the newly arrived rows, continuing the wind series of the last run
+        window_state = WindowState.from_dict(state.get("window_state")) if window_features else None
+        df = prepare_data(df, "score", window_state, outlier_bounds)
+        if df.empty:
+            # All new rows were in excluded months or outliers; skip them for good
+            print("No new rows left to score after preprocessing.")
+            write_watermark(
+                source,
+                new_watermark,
+                bucket_name,
+                watermark_store,
+                rows_scored=0,
+                window_state=window_state.to_dict() if window_state is not None else None,
+                source_position=source_position,
+            )
+            return
+    else:
+        # Load the prepared test data, from the feature store when enabled
+        store_path = None
+        if config["FeatureStore"].getboolean("enabled", fallback=False):
+            store_path = config["FeatureStore"]["path"]
+        df = load_features(
+            source,
+            bucket_name,
+            "score",
+            store_path,
+            window_features,
+            validate=validator,
+            outlier_bounds=outlier_bounds,
+        )
+
+    if config["Surrogate"].getboolean("enabled", fallback=False):
+        # Use the O(1) lookup table when it met its error bound, else the full forest
+        model = surrogate_or_model(
+            load_surrogate(model_name, "champion"),
+            lambda: load_model_by_alias(model_name, "champion"),
+        )
+    else:
+        model = load_model_by_alias(model_name, "champion")
+    print("Model loaded successfully from MLflow Server...")
+
+    # Score the data using the model
+    metrics = validator.metrics()
+    if shadow_version is not None:
+        # Score the shadow model alongside the champion on the same feature matrix
+        challenger = load_model_by_version(model_name, shadow_version)
+        print(f"Model version {shadow_version} loaded for shadow scoring...")
+        scored_df, divergence = shadow_score(df, model, challenger, champion_window, shadow_window)
+        metrics.update(divergence)
+        print(f"Shadow divergence: {divergence}")
+    else:
+        scored_df = batch_score(df, model, window_features=champion_window)
+
+    scoring_sketch = None
+    if drift:
+        # Sketch the scored inputs and predictions and compare with the training sketch
+        scoring_sketch = build_sketch(
+            build_feature_matrix(scored_df, champion_window), scored_df["score"].values
+        )
+        training_sketch = load_training_sketch(model_name, "champion")
+        if training_sketch is not None:
+            metrics.update(drift_statistics(training_sketch, scoring_sketch))
+
+    if metrics or scoring_sketch is not None:
+        setup_mlflow_experiment(MLFLOW_TRACKING_URI, mlflow_config["experiment_name"])
+        with mlflow.start_run(run_name=scoring_config["scoring_run_name"]):
+            mlflow.log_metrics(metrics)
+            if scoring_sketch is not None:
+                mlflow.log_dict(scoring_sketch.to_dict(), "drift/scoring_sketch.json")
+
+    # Perform the post-processing and save the results
+    if incremental:
+        part_name = f"result/part-{new_watermark:%Y%m%d%H%M}"
+        publish_data(scored_df, bucket_name, file_name=part_name)
+        write_watermark(
+            source,
+            new_watermark,
+            bucket_name,
+            watermark_store,
+            output_part=f"output_files/{part_name}.csv",
+            rows_scored=int(scored_df.shape[0]),
+            window_state=window_state.to_dict() if window_state is not None else None,
+            source_position=source_position,
+        )
+    else:
+        publish_data(scored_df, bucket_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Latency-budgeted compression of the tree ensemble.
+
+This module measures how holdout RMSE, per-row scoring latency and serialized
+size change with the number of trees, optionally distils the forest into
+smaller forests trained on its predictions, and selects the smallest model
+that stays within an RMSE tolerance and a per-row latency budget.
+
+Functions:
+- truncate_forest: Keep only the first trees of a fitted forest.
+- distill_forest: Train a smaller forest on the predictions of a larger one.
+- measure_latency: Per-row prediction latency of a model.
+- model_size_bytes: Serialized size of a model.
+- compression_curve: RMSE, latency and size for each candidate tree count.
+- select_forest: Pick the smallest candidate meeting the tolerance and budget.
+- rebuild_forest: Build the selected candidate from a forest fitted on more data.
+"""
+
+import copy
+import io
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+from sklearn.ensemble import ExtraTreesRegressor
+
+from utils._tracking import AsyncMlflowLogger
+
+
+def truncate_forest(model: ExtraTreesRegressor, n_trees: int) -> ExtraTreesRegressor:
+    """
+    Return a copy of a fitted forest that keeps only its first `n_trees` trees.
+
+    Args:
+        model (ExtraTreesRegressor): The fitted forest.
+        n_trees (int): Number of trees to keep.
+
+    Returns:
+        ExtraTreesRegressor: The truncated forest (trees are shared, not copied).
+    """
+    truncated = copy.copy(model)
+    truncated.estimators_ = model.estimators_[:n_trees]
+    truncated.n_estimators = n_trees
+    return truncated
+
+
+def distill_forest(
+    model: ExtraTreesRegressor, X_train: np.ndarray, n_trees: int
+) -> ExtraTreesRegressor:
+    """
+    Train a forest of `n_trees` trees on the predictions of a larger forest.
+
+    Args:
+        model (ExtraTreesRegressor): The fitted teacher forest.
+        X_train (np.ndarray): The training features.
+        n_trees (int): Number of trees in the distilled forest.
+
+    Returns:
+        ExtraTreesRegressor: The distilled forest.
+    """
+    student = ExtraTreesRegressor(**{**model.get_params(), "n_estimators": n_trees})
+    return student.fit(X_train, model.predict(X_train))
+
+
+def measure_latency(model: Any, X: np.ndarray, repeats: int = 3) -> float:
+    """
+    Measure the per-row prediction latency of a model in microseconds.
+
+    Args:
+        model (Any): The model to time.
+        X (np.ndarray): The rows to predict.
+        repeats (int): Number of timed runs; the fastest one is reported.
+
+    Returns:
+        float: Microseconds per row.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / len(X) * 1e6
+
+
+def model_size_bytes(model: Any) -> int:
+    """Return the size of the model serialized with joblib."""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+def compression_curve(
+    model: ExtraTreesRegressor,
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    sizes: Sequence[int],
+    distill: bool = False,
+    latency_rows: int = 1000,
+) -> List[Dict[str, Any]]:
+    """
+    Compute holdout RMSE, latency and size for each candidate tree count.
+
+    The RMSE of every truncated forest comes from one pass of per-tree
+    predictions averaged cumulatively, so the whole curve costs about one
+    full-forest prediction.
+
+    Args:
+        model (ExtraTreesRegressor): The fitted forest.
+        X_train (np.ndarray): The training features, used for distillation.
+        X_test (np.ndarray): The holdout features.
+        y_test (np.ndarray): The holdout targets.
+        sizes (Sequence[int]): Candidate tree counts.
+        distill (bool): Also evaluate a distilled forest for each candidate size.
+        latency_rows (int): Number of holdout rows used to time predictions.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per candidate with its variant, tree
+          count, `rmse`, `latency_us` and `size_bytes`, plus the fitted `model`.
+    """
+    n_total = len(model.estimators_)
+    sizes = sorted({n for n in sizes if 0 < n < n_total} | {n_total})
+    latency_sample = X_test[:latency_rows]
+
+    per_tree = np.stack([tree.predict(X_test) for tree in model.estimators_])
+    cumulative_mean = np.cumsum(per_tree, axis=0) / np.arange(1, n_total + 1)[:, None]
+
+    curve = []
+    for n_trees in sizes:
+        candidate = model if n_trees == n_total else truncate_forest(model, n_trees)
+        errors = cumulative_mean[n_trees - 1] - y_test
+        curve.append(
+            {
+                "variant": "truncated",
+                "n_trees": n_trees,
+                "rmse": float(np.sqrt(np.mean(errors**2))),
+                "latency_us": measure_latency(candidate, latency_sample),
+                "size_bytes": model_size_bytes(candidate),
+                "model": candidate,
+            }
+        )
+
+        if distill and n_trees < n_total:
+            student = distill_forest(model, X_train, n_trees)
+            errors = student.predict(X_test) - y_test
+            curve.append(
+                {
+                    "variant": "distilled",
+                    "n_trees": n_trees,
+                    "rmse": float(np.sqrt(np.mean(errors**2))),
+                    "latency_us": measure_latency(student, latency_sample),
+                    "size_bytes": model_size_bytes(student),
+                    "model": student,
+                }
+            )
+    return curve
+
+
+def select_forest(
+    model: ExtraTreesRegressor,
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    sizes: Sequence[int],
+    rmse_tolerance: float,
+    latency_budget_us: float,
+    tracker: AsyncMlflowLogger,
+    distill: bool = False,
+) -> Tuple[ExtraTreesRegressor, Dict[str, Any]]:
+    """
+    Select the smallest forest within the RMSE tolerance and latency budget.
+
+    A candidate is accepted when its holdout RMSE is at most the full forest's
+    RMSE times `1 + rmse_tolerance` and its per-row latency is within
+    `latency_budget_us`. The full forest is kept when no candidate qualifies.
+    The curve and the selection are logged through `tracker`.
+
+    Args:
+        model (ExtraTreesRegressor): The fitted forest.
+        X_train (np.ndarray): The training features, used for distillation.
+        X_test (np.ndarray): The holdout features.
+        y_test (np.ndarray): The holdout targets.
+        sizes (Sequence[int]): Candidate tree counts.
+        rmse_tolerance (float): Allowed relative RMSE increase over the full forest.
+        latency_budget_us (float): Allowed prediction latency per row, in microseconds.
+        tracker (AsyncMlflowLogger): The run's logger.
+        distill (bool): Also consider distilled forests.
+
+    Returns:
+        Tuple[ExtraTreesRegressor, Dict[str, Any]]: The selected model and its curve entry.
+    """
+    curve = compression_curve(model, X_train, X_test, y_test, sizes, distill)
+    full = next(p for p in curve if p["model"] is model)
+    max_rmse = full["rmse"] * (1 + rmse_tolerance)
+
+    for point in curve:
+        prefix = f"compression_{point['variant']}"
+        tracker.log_metrics(
+            {
+                f"{prefix}_rmse": point["rmse"],
+                f"{prefix}_latency_us": point["latency_us"],
+                f"{prefix}_size_bytes": point["size_bytes"],
+            },
+            step=point["n_trees"],
+        )
+
+    accepted = [p for p in curve if p["rmse"] <= max_rmse and p["latency_us"] <= latency_budget_us]
+    if accepted:
+        selected = min(accepted, key=lambda p: (p["size_bytes"], p["latency_us"]))
+    else:
+        print("No compressed forest meets the RMSE tolerance and latency budget.")
+        selected = full
+
+    tracker.log_params(
+        {
+            "selected_variant": selected["variant"],
+            "selected_n_trees": selected["n_trees"],
+        }
+    )
+    tracker.log_metrics(
+        {
+            "selected_rmse": selected["rmse"],
+            "selected_latency_us": selected["latency_us"],
+            "selected_size_bytes": selected["size_bytes"],
+        }
+    )
+    print(
+        f"Selected {selected['variant']} forest with {selected['n_trees']} trees: "
+        f"RMSE {selected['rmse']:.3f} (full {full['rmse']:.3f}), "
+        f"{selected['latency_us']:.1f} us/row, {selected['size_bytes']} bytes"
+    )
+    return selected["model"], selected
+
+
+def rebuild_forest(
+    model: ExtraTreesRegressor, point: Dict[str, Any], X_train: np.ndarray
+) -> ExtraTreesRegressor:
+    """
+    Build a selected candidate from a forest fitted on all the training data.
+
+    The selection runs on a forest fitted on part of the training rows, so it
+    can be scored on the rest. Trees are seeded in order from `random_state`,
+    so the first `n_trees` trees of `model` are the forest of that size
+    fitted on all the rows.
+
+    Args:
+        model (ExtraTreesRegressor): The forest fitted on all the training data.
+        point (Dict[str, Any]): The curve entry returned by `select_forest`.
+        X_train (np.ndarray): All the training features, used for distillation.
+
+    Returns:
+        ExtraTreesRegressor: The selected variant and tree count taken from `model`.
+    """
+    n_trees = point["n_trees"]
+    if point["variant"] == "distilled":
+        return distill_forest(model, X_train, n_trees)
+    if n_trees >= len(model.estimators_):
+        return model
+    return truncate_forest(model, n_trees)
@@ -0,0 +1,294 @@
+"""
+Streaming drift sketches for model inputs and predictions.
+
+This module builds compact, mergeable summaries of the feature matrix and the
+model predictions in a single streaming pass, so that scoring data can be
+compared with the training data without retaining either dataset.
+
+Classes:
+- Histogram: Fixed-bin histogram with underflow and overflow bins.
+- QuantileSketch: Bounded-size centroid sketch for approximate quantiles.
+- DriftSketch: Histogram and quantile sketch per feature and for predictions.
+
+Functions:
+- build_sketch: Build a DriftSketch over a feature matrix in chunks.
+- drift_statistics: Compare a scoring sketch against a reference sketch.
+- load_training_sketch: Load the training sketch stored with a model version.
+"""
+
+from typing import Any, Dict, Optional
+
+import mlflow
+import numpy as np
+import pandas as pd
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+
+
+TRAINING_SKETCH_PATH = "drift/training_sketch.json"
+PREDICTION = "prediction"
+
+# Metric-safe name and fixed histogram range for every sketched column
+SKETCH_COLUMNS = {
+    "Wind Speed (m/s)": ("wind_speed", 0.0, 30.0),
+    "Theoretical_Power_Curve (KWh)": ("theoretical_power", 0.0, 4000.0),
+    "Wind Direction (°)": ("wind_direction", 0.0, 360.0),
+    "Month": ("month", 0.5, 12.5),
+    "Hour": ("hour", -0.5, 23.5),
+    PREDICTION: ("prediction", 0.0, 4000.0),
+}
+DEFAULT_BINS = 24
+DEFAULT_CAPACITY = 200
+
+
+class Histogram:
+    """Fixed-bin histogram over [low, high) with underflow and overflow bins."""
+
+    def __init__(self, low: float, high: float, bins: int = DEFAULT_BINS) -> None:
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of non-null values to the histogram."""
+        scaled = (values - self.low) * (self.bins / (self.high - self.low))
+        idx = np.clip(np.floor(scaled), -1, self.bins).astype(np.int64) + 1
+        self.counts += np.bincount(idx, minlength=self.bins + 2)
+
+    def merge(self, other: "Histogram") -> None:
+        """Merge another histogram with identical bins into this one."""
+        self.counts += other.counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "low": self.low,
+            "high": self.high,
+            "bins": self.bins,
+            "counts": self.counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        hist = cls(data["low"], data["high"], data["bins"])
+        hist.counts = np.asarray(data["counts"], dtype=np.int64)
+        return hist
+
+
+class QuantileSketch:
+    """Approximate quantiles from at most `capacity` weighted centroids.
+
+    Each update summarises the sorted chunk into equal-weight centroids and
+    merges them with the existing ones, so memory is bounded by `capacity`
+    regardless of how many values have been seen.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        if len(means) > self.capacity:
+            cum_before = np.cumsum(weights) - weights
+            groups = np.floor(cum_before / weights.sum() * self.capacity).astype(np.int64)
+            group_weights = np.bincount(groups, weights=weights)
+            group_sums = np.bincount(groups, weights=means * weights)
+            keep = group_weights > 0
+            means = group_sums[keep] / group_weights[keep]
+            weights = group_weights[keep]
+        self.means, self.weights = means, weights
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of non-null values to the sketch."""
+        if len(values) == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(
+            np.concatenate([self.means, values.astype(np.float64)]),
+            np.concatenate([self.weights, np.ones(len(values))]),
+        )
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Merge another sketch into this one."""
+        if len(other.means) == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+        )
+
+    def quantile(self, q: float) -> float:
+        """Return the approximate q-th quantile (0 <= q <= 1)."""
+        if len(self.means) == 0:
+            return float("nan")
+        positions = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        xp = np.concatenate([[0.0], positions, [1.0]])
+        fp = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q, xp, fp))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["capacity"])
+        sketch.means = np.asarray(data["means"], dtype=np.float64)
+        sketch.weights = np.asarray(data["weights"], dtype=np.float64)
+        sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class DriftSketch:
+    """Histogram, quantile sketch and null count per feature and for predictions."""
+
+    def __init__(self, bins: int = DEFAULT_BINS, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.histograms = {
+            col: Histogram(low, high, bins) for col, (_, low, high) in SKETCH_COLUMNS.items()
+        }
+        self.quantiles = {col: QuantileSketch(capacity) for col in SKETCH_COLUMNS}
+        self.nulls = {col: 0 for col in SKETCH_COLUMNS}
+        self.rows = 0
+
+    def update(self, features: pd.DataFrame, predictions: Optional[np.ndarray] = None) -> None:
+        """Add a chunk of feature rows and, optionally, their predictions."""
+        columns = {col: features[col].to_numpy(dtype=np.float64) for col in features.columns}
+        if predictions is not None:
+            columns[PREDICTION] = np.asarray(predictions, dtype=np.float64)
+
+        self.rows += len(features)
+        for col, values in columns.items():
+            if col not in SKETCH_COLUMNS:
+                continue
+            mask = np.isnan(values)
+            self.nulls[col] += int(mask.sum())
+            values = values[~mask]
+            self.histograms[col].update(values)
+            self.quantiles[col].update(values)
+
+    def merge(self, other: "DriftSketch") -> None:
+        """Merge another sketch with the same layout into this one."""
+        self.rows += other.rows
+        for col in SKETCH_COLUMNS:
+            self.histograms[col].merge(other.histograms[col])
+            self.quantiles[col].merge(other.quantiles[col])
+            self.nulls[col] += other.nulls[col]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "columns": {
+                col: {
+                    "histogram": self.histograms[col].to_dict(),
+                    "quantiles": self.quantiles[col].to_dict(),
+                    "nulls": self.nulls[col],
+                }
+                for col in SKETCH_COLUMNS
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DriftSketch":
+        sketch = cls()
+        sketch.rows = data["rows"]
+        for col, entry in data["columns"].items():
+            sketch.histograms[col] = Histogram.from_dict(entry["histogram"])
+            sketch.quantiles[col] = QuantileSketch.from_dict(entry["quantiles"])
+            sketch.nulls[col] = entry["nulls"]
+        return sketch
+
+
+def build_sketch(
+    features: pd.DataFrame,
+    predictions: Optional[np.ndarray] = None,
+    chunksize: int = 100_000,
+) -> DriftSketch:
+    """
+    Build a DriftSketch over a feature matrix in a single streaming pass.
+
+    Args:
+        features (pd.DataFrame): The model input columns.
+        predictions (Optional[np.ndarray]): The model predictions for `features`.
+        chunksize (int): Number of rows summarised per update.
+
+    Returns:
+        DriftSketch: The populated sketch.
+    """
+    sketch = DriftSketch()
+    for start in range(0, len(features), chunksize):
+        end = start + chunksize
+        chunk_predictions = None if predictions is None else predictions[start:end]
+        sketch.update(features.iloc[start:end], chunk_predictions)
+    return sketch
+
+
+def drift_statistics(reference: DriftSketch, current: DriftSketch) -> Dict[str, float]:
+    """
+    Compare a scoring sketch against a reference (training) sketch.
+
+    For every sketched column this reports the population stability index and
+    the maximum CDF distance over the shared histogram bins, and the shift of
+    the median and 90th percentile relative to the reference.
+
+    Args:
+        reference (DriftSketch): The sketch built on the training data.
+        current (DriftSketch): The sketch built on the scoring data.
+
+    Returns:
+        Dict[str, float]: Drift metrics keyed as `drift_<statistic>_<column>`.
+    """
+    eps = 1e-6
+    stats = {}
+    for col, (name, _, _) in SKETCH_COLUMNS.items():
+        ref_counts = reference.histograms[col].counts
+        cur_counts = current.histograms[col].counts
+        if ref_counts.sum() == 0 or cur_counts.sum() == 0:
+            continue
+
+        ref_p = ref_counts / ref_counts.sum()
+        cur_p = cur_counts / cur_counts.sum()
+        psi = np.sum((cur_p - ref_p) * np.log((cur_p + eps) / (ref_p + eps)))
+        ks = np.max(np.abs(np.cumsum(cur_p) - np.cumsum(ref_p)))
+
+        ref_q, cur_q = reference.quantiles[col], current.quantiles[col]
+        scale = max(ref_q.quantile(0.75) - ref_q.quantile(0.25), eps)
+
+        stats[f"drift_psi_{name}"] = float(psi)
+        stats[f"drift_ks_{name}"] = float(ks)
+        stats[f"drift_median_shift_{name}"] = (cur_q.quantile(0.5) - ref_q.quantile(0.5)) / scale
+        stats[f"drift_p90_shift_{name}"] = (cur_q.quantile(0.9) - ref_q.quantile(0.9)) / scale
+    return stats
+
+
+def load_training_sketch(model_name: str, alias: str) -> Optional[DriftSketch]:
+    """
+    Load the training sketch stored with the model version behind an alias.
+
+    Args:
+        model_name (str): The name of the registered model.
+        alias (str): The alias of the model version (e.g. "champion").
+
+    Returns:
+        Optional[DriftSketch]: The training sketch, or None if the version has none.
+    """
+    client = MlflowClient()
+    run_id = client.get_model_version_by_alias(model_name, alias).run_id
+    try:
+        data = mlflow.artifacts.load_dict(f"runs:/{run_id}/{TRAINING_SKETCH_PATH}")
+    except (MlflowException, OSError):
+        print(f"No training sketch stored for '{model_name}@{alias}'.")
+        return None
+    return DriftSketch.from_dict(data)
@@ -1,196 +1,301 @@
-"""
-MLflow Experiment Setup and Model Evaluation Module
-
-This module provides functions to:
-1. Set up and manage MLflow experiments.
-2. Initialize model tags and aliases.
-3. Evaluate challenger models and update the model registry based on performance.
-
-Dependencies:
-- `mlflow`: For MLflow experiment and model management.
-- `os`: For environment variable access.
-- `sklearn`: For model performance evaluation metrics.
-"""
-
-
-import mlflow
-import pandas as pd
-from mlflow.exceptions import MlflowException
-from mlflow.tracking import MlflowClient
-from sklearn.metrics import root_mean_squared_error
-
-from utils._config import load_model_by_alias
-
-
-def setup_mlflow_tracking(uri="http://localhost:5000"):
-    """
-    Set the MLflow tracking URI and initialize the client.
-
-    Args:
-        uri (str): MLflow tracking server URI.
-
-    Returns:
-        MlflowClient: Initialized MLflow client.
-    """
-    mlflow.set_tracking_uri(uri)
-    print("Tracking URI:", mlflow.get_tracking_uri())
-    return MlflowClient()
-
-
-def setup_mlflow_experiment(mlflow_tracking_uri, experiment_name):
-    """
-    Ensure MLflow experiment exists and set it for logging.
-
-    Args:
-        mlflow_tracking_uri (str): MLflow tracking server URI.
-        experiment_name (str): The name of the experiment to create or use.
-
-    Raises:
-        MlflowException: If there's an issue interacting with MLflow.
-    """
-    print(f"MLflow Tracking URI: {mlflow_tracking_uri}")
-    mlflow.set_tracking_uri(mlflow_tracking_uri)
-    client = MlflowClient()
-
-    try:
-        experiment = client.get_experiment_by_name(experiment_name)
-        if experiment is None:
-            mlflow.create_experiment(experiment_name)
-            print(f'Experiment "{experiment_name}" created.')
-        else:
-            print(f'Experiment "{experiment_name}" already exists.')
-        mlflow.set_experiment(experiment_name)
-    except MlflowException as e:
-        print(f"Error setting experiment: {e}")
-
-
-def mlflow_initial_tags_aliases(registered_model_name):
-    """
-    Set initial 'Candidate' alias for the latest version of a newly registered model.
-
-    Args:
-        registered_model_name (str): The name of the registered model.
-    """
-    client = MlflowClient()
-
-    # Get all versions of the model and sort by version number to find the latest
-    all_versions = client.search_model_versions(f"name='{registered_model_name}'")
-    if all_versions:
-        latest_version = max(all_versions, key=lambda v: int(v.version))
-
-        # Set the 'Candidate' alias for the latest version
-        client.set_registered_model_alias(
-            registered_model_name, "candidate", latest_version.version
-        )
-        print(
-            f"Alias 'candidate' set for version {latest_version.version}"
-            f"of model '{registered_model_name}'."
-        )
-    else:
-        print("No versions found for the specified model.")
-
-
-def update_model_alias(client, model_name, new_alias, version, old_alias=None):
-    """
-    Set a new alias for a model version and optionally delete an old alias.
-    """
-    client.set_registered_model_alias(model_name, new_alias, version)
-    if old_alias:
-        client.delete_registered_model_alias(model_name, old_alias)
-    print(f"Alias '{new_alias}' set for version {version} of model '{model_name}'.")
-    if old_alias:
-        print(f"Alias '{old_alias}' removed from model '{model_name}'.")
-
-
-def calculate_rmse(predictions, true_values):
-    """
-    Calculate the Root Mean Squared Error (RMSE) between predictions and true values.
-
-    Args:
-        predictions (array-like): Predicted values.
-        true_values (array-like): Actual values.
-
-    Returns:
-        float: Computed RMSE.
-    """
-    # return np.sqrt(mean_squared_error(true_values, predictions))
-    return root_mean_squared_error(true_values, predictions)
-
-
-def evaluate_and_update_champion(client, model_name, data, true_values):
-    """
-    Evaluate challenger and champion models, updating aliases based on RMSE comparison.
-    """
-    # Load models
-    challenger_model = load_model_by_alias(model_name, "challenger")
-    champion_model = load_model_by_alias(model_name, "champion")
-
-    # Generate predictions and calculate RMSE
-    challenger_rmse = calculate_rmse(challenger_model.predict(data), true_values)
-    champion_rmse = calculate_rmse(champion_model.predict(data), true_values)
-
-    # Determine whether to update champion alias
-    if challenger_rmse < champion_rmse:
-        print("Challenger model is better. Updating Champion model...")
-        challenger_version = client.get_model_version_by_alias(model_name, "challenger").version
-        champion_version = client.get_model_version_by_alias(model_name, "champion").version
-
-        # Update aliases: set 'challenger' as 'champion' and archive previous champion
-        update_model_alias(
-            client, model_name, "champion", challenger_version, old_alias="challenger"
-        )
-        update_model_alias(client, model_name, "archived", champion_version)
-    else:
-        print("Current Champion model is better; no update performed.")
-        challenger_version = client.get_model_version_by_alias(model_name, "challenger").version
-        update_model_alias(
-            client, model_name, "archived", challenger_version, old_alias="challenger"
-        )
-
-
-def prepare_evaluation_data():
-    """
-    Prepare a sample data frame for evaluation.
-    """
-    data = pd.DataFrame(
-        {
-            "Wind Speed (m/s)": [8.218296051, 4.995032787, 2.212670088, 2.190548897, 4.157712936],
-            "Theoretical_Power_Curve (KWh)": [1657.373187, 334.7802577, 0, 0, 152.8500671],
-            "Wind Direction (°)": [78.12586975, 17.07011986, 127.6598969, 329.9155884, 81.20819855],
-            "Month": [8, 5, 4, 7, 4],
-            "Hour": [21, 11, 19, 11, 10],
-        }
-    )
-    true_values = [1339.537964, 277.7774048, 0, 0, 87.54579926]
-    return data, true_values
-
-
-def run_mlflow_model_update(config):
-    mlflow_config = config["MLflow"]
-    model_name = mlflow_config["registered_model_name"]
-
-    client = setup_mlflow_tracking()
-    print("MLflow updating 'candidate' to 'challenger'...")
-
-    try:
-        candidate_version = client.get_model_version_by_alias(model_name, "candidate").version
-        update_model_alias(
-            client, model_name, "challenger", candidate_version, old_alias="candidate"
-        )
-    except mlflow.exceptions.MlflowException:
-        print(f"No 'candidate' version found for model '{model_name}'.")
-        return
-
-    # Check if there is only one model version in the registry
-    model_versions = client.search_model_versions(f"name='{model_name}'")
-    if len(model_versions) == 1:
-        champion_version = model_versions[0].version
-        update_model_alias(client, model_name, "champion", champion_version, old_alias="challenger")
-    else:
-        # Prepare evaluation data and evaluate models
-        data, true_values = prepare_evaluation_data()
-        evaluate_and_update_champion(client, model_name, data, true_values)
-
-
-if __name__ == "__main__":
-    run_mlflow_model_update()
+"""
+MLflow Experiment Setup and Model Evaluation Module
+
+This module provides functions to:
+1. Set up and manage MLflow experiments.
+2. Initialize model tags and aliases.
+3. Evaluate challenger models and update the model registry based on performance.
+
+Each model version is tagged with the feature set it was trained on, so the
+models can be compared and scored on their own inputs, and with the wind speed
+outlier bounds of its training data, which scoring applies as fixed bounds.
+
+Dependencies:
+- `mlflow`: For MLflow experiment and model management.
+- `os`: For environment variable access.
+- `sklearn`: For model performance evaluation metrics.
+"""
+
+import json
+import os
+
+import mlflow
+import pandas as pd
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+from sklearn.metrics import root_mean_squared_error
+
+from pipelines.feature_store import load_features
+from pipelines.pre_process import feature_columns, split_features
+from pipelines.validation import DataValidator
+from utils._config import load_model_by_version
+from utils._registry import RegistryClient
+
+
+# Model version tag recording whether the model takes the lag and rolling wind features
+WINDOW_FEATURES_TAG = "window_features"
+
+# Model version tag holding the wind speed outlier bounds of the training data
+OUTLIER_BOUNDS_TAG = "wind_speed_bounds"
+
+
+def setup_mlflow_tracking(uri=None):
+    """
+    Set the MLflow tracking URI and initialize the client.
+
+    Args:
+        uri (str): MLflow tracking server URI. Defaults to `MLFLOW_TRACKING_URI`
+          from the environment file, then to a local server.
+
+    Returns:
+        MlflowClient: Initialized MLflow client.
+    """
+    mlflow.set_tracking_uri(uri or os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000"))
+    print("Tracking URI:", mlflow.get_tracking_uri())
+    return MlflowClient()
+
+
+def setup_mlflow_experiment(mlflow_tracking_uri, experiment_name):
+    """
+    Ensure MLflow experiment exists and set it for logging.
+
+    Args:
+        mlflow_tracking_uri (str): MLflow tracking server URI.
+        experiment_name (str): The name of the experiment to create or use.
+
+    Raises:
+        MlflowException: If there's an issue interacting with MLflow.
+    """
+    print(f"MLflow Tracking URI: {mlflow_tracking_uri}")
+    mlflow.set_tracking_uri(mlflow_tracking_uri)
+    client = MlflowClient()
+
+    try:
+        experiment = client.get_experiment_by_name(experiment_name)
+        if experiment is None:
+            mlflow.create_experiment(experiment_name)
+            print(f'Experiment "{experiment_name}" created.')
+        else:
+            print(f'Experiment "{experiment_name}" already exists.')
+        mlflow.set_experiment(experiment_name)
+    except MlflowException as e:
+        print(f"Error setting experiment: {e}")
+
+
+def mlflow_initial_tags_aliases(registered_model_name, window_features=False, outlier_bounds=None):
+    """
+    Set initial 'Candidate' alias and feature set tags for the latest version of a
+    newly registered model.
+
+    Args:
+        registered_model_name (str): The name of the registered model.
+        window_features (bool): Whether the model takes the lag and rolling wind features.
+        outlier_bounds (Optional[Tuple[float, float]]): The wind speed outlier bounds
+          of the training data.
+    """
+    registry = RegistryClient(registered_model_name)
+
+    # Fetch only the highest version number instead of scanning every version
+    latest_version = registry.latest_version()
+    if latest_version is not None:
+        # Record the model inputs and set the 'Candidate' alias for the latest version
+        registry.set_version_tag(
+            latest_version.version, WINDOW_FEATURES_TAG, str(window_features).lower()
+        )
+        if outlier_bounds is not None:
+            registry.set_version_tag(
+                latest_version.version, OUTLIER_BOUNDS_TAG, json.dumps(list(outlier_bounds))
+            )
+        registry.set_alias("candidate", latest_version.version)
+        registry.commit()
+        print(
+            f"Alias 'candidate' set for version {latest_version.version} "
+            f"of model '{registered_model_name}'."
+        )
+    else:
+        print("No versions found for the specified model.")
+
+
+def update_model_alias(registry, new_alias, version, old_alias=None):
+    """
+    Stage a new alias for a model version and optionally the removal of an old alias.
+
+    The changes are sent to the registry by `registry.commit()`.
+    """
+    registry.set_alias(new_alias, version)
+    if old_alias:
+        registry.delete_alias(old_alias)
+    print(f"Alias '{new_alias}' set for version {version} of model '{registry.model_name}'.")
+    if old_alias:
+        print(f"Alias '{old_alias}' removed from model '{registry.model_name}'.")
+
+
+def model_window_features(registry, version):
+    """
+    Return whether a model version takes the lag and rolling wind features.
+
+    Versions registered before the feature set was recorded take the base features.
+
+    Args:
+        registry (RegistryClient): The registry of the model.
+        version (str): The model version.
+
+    Returns:
+        bool: Whether the window features are part of the model inputs.
+    """
+    return registry.version_tags(version).get(WINDOW_FEATURES_TAG) == "true"
+
+
+def model_outlier_bounds(registry, version):
+    """
+    Return the wind speed outlier bounds recorded with a model version.
+
+    Args:
+        registry (RegistryClient): The registry of the model.
+        version (str): The model version.
+
+    Returns:
+        Optional[Tuple[float, float]]: The bounds, or None if the version has none.
+    """
+    bounds = registry.version_tags(version).get(OUTLIER_BOUNDS_TAG)
+    return tuple(json.loads(bounds)) if bounds else None
+
+
+def calculate_rmse(predictions, true_values):
+    """
+    Calculate the Root Mean Squared Error (RMSE) between predictions and true values.
+
+    Args:
+        predictions (array-like): Predicted values.
+        true_values (array-like): Actual values.
+
+    Returns:
+        float: Computed RMSE.
+    """
+    # return np.sqrt(mean_squared_error(true_values, predictions))
+    return root_mean_squared_error(true_values, predictions)
+
+
+def evaluate_and_update_champion(registry, data, true_values):
+    """
+    Evaluate challenger and champion models, updating aliases based on RMSE comparison.
+
+    Both models predict the same holdout rows, each from the columns of the
+    feature set it was trained on.
+
+    Args:
+        registry (RegistryClient): The registry of the model.
+        data (pd.DataFrame): The holdout features, including the columns of both models.
+        true_values (array-like): The holdout targets.
+    """
+    # Resolve both aliases once and load the models by version
+    challenger_version = registry.version_by_alias("challenger")
+    champion_version = registry.version_by_alias("champion")
+    challenger_model = load_model_by_version(registry.model_name, challenger_version)
+    champion_model = load_model_by_version(registry.model_name, champion_version)
+    challenger_data = data[feature_columns(model_window_features(registry, challenger_version))]
+    champion_data = data[feature_columns(model_window_features(registry, champion_version))]
+
+    # Generate predictions and calculate RMSE
+    challenger_rmse = calculate_rmse(challenger_model.predict(challenger_data), true_values)
+    champion_rmse = calculate_rmse(champion_model.predict(champion_data), true_values)
+
+    # Determine whether to update champion alias
+    if challenger_rmse < champion_rmse:
+        print("Challenger model is better. Updating Champion model...")
+
+        # Update aliases: set 'challenger' as 'champion' and archive previous champion
+        update_model_alias(registry, "champion", challenger_version, old_alias="challenger")
+        update_model_alias(registry, "archived", champion_version)
+    else:
+        print("Current Champion model is better; no update performed.")
+        update_model_alias(registry, "archived", challenger_version, old_alias="challenger")
+
+
+def prepare_evaluation_data(config=None, window_features=False):
+    """
+    Prepare the data frame for evaluation.
+
+    When the feature store is enabled or a compared model takes the window
+    features, the holdout split of the prepared training features is used
+    (opened from the store when enabled); otherwise a fixed sample is used.
+
+    Args:
+        config (Optional[ConfigParser]): The pipeline configuration.
+        window_features (bool): Whether the holdout needs the lag and rolling wind features.
+
+    Returns:
+        Tuple[pd.DataFrame, array-like]: The holdout features with named columns
+          and the holdout targets.
+    """
+    if config is not None:
+        use_store = config["FeatureStore"].getboolean("enabled", fallback=False)
+        if use_store or window_features:
+            # Validate as in training (sharing its feature store entry); the training
+            # run has already published any quarantined rows
+            validator = DataValidator(
+                mode="train",
+                policy=config["Validation"].get("policy", fallback="fail"),
+                chunksize=config["Validation"].getint("chunksize", fallback=1_000_000),
+                publish=False,
+            )
+            prepared_df = load_features(
+                config["Files"]["training_data"],
+                os.getenv("s3_bucket"),
+                "train",
+                config["FeatureStore"]["path"] if use_store else None,
+                window_features,
+                validate=validator,
+            )
+            _, _, X_test, y_test = split_features(prepared_df, test_size=0.2)
+            columns = prepared_df.columns.drop("LV ActivePower (kW)")
+            return pd.DataFrame(X_test, columns=columns), y_test
+
+    data = pd.DataFrame(
+        {
+            "Wind Speed (m/s)": [8.218296051, 4.995032787, 2.212670088, 2.190548897, 4.157712936],
+            "Theoretical_Power_Curve (KWh)": [1657.373187, 334.7802577, 0, 0, 152.8500671],
+            "Wind Direction (°)": [78.12586975, 17.07011986, 127.6598969, 329.9155884, 81.20819855],
+            "Month": [8, 5, 4, 7, 4],
+            "Hour": [21, 11, 19, 11, 10],
+        }
+    )
+    true_values = [1339.537964, 277.7774048, 0, 0, 87.54579926]
+    return data, true_values
+
+
+def run_mlflow_model_update(config):
+    mlflow_config = config["MLflow"]
+    model_name = mlflow_config["registered_model_name"]
+
+    client = setup_mlflow_tracking()
+    registry = RegistryClient(model_name, client)
+    print("MLflow updating 'candidate' to 'challenger'...")
+
+    try:
+        candidate_version = registry.version_by_alias("candidate")
+    except mlflow.exceptions.MlflowException:
+        candidate_version = None
+    if candidate_version is None:
+        print(f"No 'candidate' version found for model '{model_name}'.")
+        return
+    update_model_alias(registry, "challenger", candidate_version, old_alias="candidate")
+
+    # Check if there is only one model version in the registry
+    if not registry.has_multiple_versions():
+        update_model_alias(registry, "champion", candidate_version, old_alias="challenger")
+    else:
+        # Prepare evaluation data with the features of both models and evaluate them
+        window_features = any(
+            model_window_features(registry, registry.version_by_alias(alias))
+            for alias in ("challenger", "champion")
+        )
+        data, true_values = prepare_evaluation_data(config, window_features)
+        evaluate_and_update_champion(registry, data, true_values)
+
+    # Send all alias changes of the promotion flow together
+    registry.commit()
+
+
+if __name__ == "__main__":
+    run_mlflow_model_update()
@@ -0,0 +1,241 @@
+"""
+Local memory-mapped store of prepared feature matrices.
+
+This module writes the output of `prepare_data` once per source file version
+as one `.npy` file per column (plus the index) and a small JSON manifest.
+Any stage or process can then open the columns as read-only memory maps and
+wrap them in a DataFrame without copying or re-parsing the CSV. Each column
+keeps its dtype and `DataFrame.attrs` are kept in the manifest, so the
+DataFrame read back equals the one written.
+
+Entries are keyed by the source file name, the preparation mode, the source
+ETag, `PREPROCESS_VERSION`, the fixed outlier bounds if any and the
+validation policy and rules version, so a changed file, a changed
+`prepare_data` or changed validation always produces a new entry. The
+validation report is kept in the manifest and restored on a hit, so cached
+runs log the same data quality metrics.
+
+Classes:
+- FeatureStore: Read and write prepared feature matrices on local disk.
+
+Functions:
+- load_features: Return prepared features for a source, via the store if enabled.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipelines.data_pull import get_data_etag, load_data
+from pipelines.pre_process import PREPROCESS_VERSION, prepare_data
+from pipelines.validation import DataValidator
+from pipelines.window_features import WindowState
+
+
+INDEX_FILE = "index.npy"
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the on-disk layout changes, so older entries are not read
+STORE_FORMAT = 3
+
+
+def _column_file(position: int) -> str:
+    return f"column-{position}.npy"
+
+
+class FeatureStore:
+    """Prepared feature matrices stored as memory-mappable `.npy` files.
+
+    Args:
+        root (str): Directory holding one sub-directory per entry.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    @staticmethod
+    def key(
+        source: str,
+        etag: str,
+        mode: str,
+        window_features: bool = False,
+        validation: Optional[str] = None,
+        outlier_bounds: Optional[Tuple[float, float]] = None,
+    ) -> str:
+        """Return the entry key for a source file version, preparation mode and validation."""
+        if window_features:
+            mode = f"{mode}-window"
+        if outlier_bounds is not None:
+            mode = f"{mode}-b{outlier_bounds[0]!r}_{outlier_bounds[1]!r}"
+        key = f"{Path(source).stem}-{mode}-{etag}-v{PREPROCESS_VERSION}-s{STORE_FORMAT}"
+        return f"{key}-{validation}" if validation else key
+
+    def exists(self, key: str) -> bool:
+        """Return whether an entry has been written."""
+        return (self.root / key / MANIFEST_FILE).is_file()
+
+    def write(self, key: str, df: pd.DataFrame, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write a prepared DataFrame as a new entry, one file per column.
+
+        The entry is written to a temporary directory and renamed into place,
+        so concurrent readers never see a partial entry.
+
+        Args:
+            key (str): The entry key.
+            df (pd.DataFrame): The prepared DataFrame.
+            metadata (Optional[Dict[str, Any]]): Extra JSON data kept in the manifest.
+
+        Raises:
+            ValueError: If a column or the index is not numeric or boolean.
+        """
+        arrays = {name: df[name].to_numpy() for name in df.columns}
+        index = df.index.to_numpy()
+        unsupported = [name for name, values in arrays.items() if values.dtype.kind not in "biuf"]
+        if unsupported or index.dtype.kind not in "biuf":
+            raise ValueError(
+                f"Only numeric columns and indexes can be stored; unsupported: "
+                f"{unsupported or ['index']}"
+            )
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.root, prefix=f".{key}-"))
+        try:
+            for position, values in enumerate(arrays.values()):
+                np.save(tmp_dir / _column_file(position), values)
+            np.save(tmp_dir / INDEX_FILE, index)
+            manifest = {
+                "columns": list(arrays),
+                "dtypes": [values.dtype.str for values in arrays.values()],
+                "rows": len(df),
+                "attrs": df.attrs,
+                "metadata": metadata or {},
+            }
+            (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+            os.rename(tmp_dir, self.root / key)
+        except OSError:
+            # Another process already published this entry
+            if not self.exists(key):
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        print(f"Features written to feature store as {key}")
+
+    def metadata(self, key: str) -> Dict[str, Any]:
+        """Return the extra data written with an entry."""
+        manifest = json.loads((self.root / key / MANIFEST_FILE).read_text(encoding="utf-8"))
+        return manifest.get("metadata", {})
+
+    def read(self, key: str) -> pd.DataFrame:
+        """
+        Open an entry as a DataFrame backed by read-only memory maps.
+
+        Args:
+            key (str): The entry key.
+
+        Returns:
+            pd.DataFrame: The prepared features with their dtypes, index and
+              attrs, without copying the data.
+        """
+        entry = self.root / key
+        manifest = json.loads((entry / MANIFEST_FILE).read_text(encoding="utf-8"))
+        # np.asarray drops the memmap subclass but keeps the mapped buffer
+        columns = {
+            name: np.asarray(np.load(entry / _column_file(position), mmap_mode="r"))
+            for position, name in enumerate(manifest["columns"])
+        }
+        index = np.asarray(np.load(entry / INDEX_FILE, mmap_mode="r"))
+        print(f"Features opened from feature store: {key}")
+        df = pd.DataFrame(columns, index=index, copy=False)
+        # JSON stores tuples as lists
+        df.attrs = {
+            name: tuple(value) if isinstance(value, list) else value
+            for name, value in manifest["attrs"].items()
+        }
+        return df
+
+    def get_or_build(
+        self,
+        key: str,
+        build: Callable[[], pd.DataFrame],
+        metadata: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Return an entry, building and writing it first if it does not exist.
+
+        Args:
+            key (str): The entry key.
+            build (Callable[[], pd.DataFrame]): Builds the prepared DataFrame.
+            metadata (Optional[Callable[[], Dict[str, Any]]]): Returns the extra
+              manifest data, called after `build`.
+
+        Returns:
+            pd.DataFrame: The prepared features.
+        """
+        if not self.exists(key):
+            df = build()
+            self.write(key, df, metadata() if metadata is not None else None)
+        return self.read(key)
+
+
+def load_features(
+    file_name: str,
+    bucket_name: str,
+    mode: str,
+    store_path: Optional[str] = None,
+    window_features: bool = False,
+    validate: Optional[DataValidator] = None,
+    outlier_bounds: Optional[Tuple[float, float]] = None,
+) -> pd.DataFrame:
+    """
+    Return the prepared features for a data file.
+
+    With a `store_path`, the features are opened from the feature store and
+    only loaded and prepared when the store has no entry for the file's
+    current ETag. Without one, the file is loaded and prepared directly.
+    `validate` runs on the raw data before preparation. When the features are
+    opened from the store, its report is restored from the entry instead.
+
+    Args:
+        file_name (str): The name of the CSV file in the S3 bucket.
+        bucket_name (str): The S3 bucket holding the data.
+        mode (str): The `prepare_data` mode ("train" or "score").
+        store_path (Optional[str]): The feature store directory, if enabled.
+        window_features (bool): Whether to add the lag and rolling wind features.
+        validate (Optional[DataValidator]): Validates the raw data.
+        outlier_bounds (Optional[Tuple[float, float]]): Fixed wind speed outlier bounds.
+
+    Returns:
+        pd.DataFrame: The prepared features.
+    """
+
+    def build() -> pd.DataFrame:
+        window_state = WindowState() if window_features else None
+        df = load_data(file_name, bucket_name)
+        if validate is not None:
+            df = validate(df)
+        return prepare_data(df, mode, window_state, outlier_bounds)
+
+    if store_path is None:
+        return build()
+
+    if validate is None:
+        validation, metadata = None, None
+    else:
+        validation = validate.cache_tag
+
+        def metadata() -> Dict[str, Any]:
+            return {"validation": validate.report.to_dict()}
+
+    store = FeatureStore(store_path)
+    etag = get_data_etag(file_name, bucket_name)
+    key = store.key(file_name, etag, mode, window_features, validation, outlier_bounds)
+    if validate is not None and store.exists(key):
+        validate.restore(store.metadata(key).get("validation"))
+    return store.get_or_build(key, build, metadata)
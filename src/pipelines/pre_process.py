@@ -1,121 +1,209 @@
-"""
-Data processing module for handling and preparing data for machine learning.
-
-This module provides functions for:
-- Validating required columns in a DataFrame.
-- Removing rows with invalid power values.
-- Preparing and cleaning the data.
-- Splitting the data into training and testing sets.
-
-Dependencies:
-- pandas: For data manipulation and analysis.
-- sklearn: For splitting the dataset into training and testing sets.
-
-Functions:
-- validate_columns: Ensures the DataFrame contains all required columns.
-- remove_invalid_power_rows: Removes rows where LV ActivePower is 0 but
- Theoretical_Power_Curve is not 0.
-- prepare_data: Prepares and cleans the data.
-- split_data: Splits the data into training and testing sets.
-"""
-
-from typing import Optional, Tuple
-
-import pandas as pd
-from sklearn.model_selection import train_test_split
-
-
-def validate_columns(df: pd.DataFrame, required_columns: list) -> None:
-    """Ensure the DataFrame contains all required columns.
-
-    Args:
-        df (pd.DataFrame): The DataFrame to validate.
-        required_columns (list): A list of required column names.
-
-    Raises:
-        ValueError: If any required column is missing.
-    """
-    for col in required_columns:
-        if col not in df.columns:
-            raise ValueError(f"Missing required column: {col}")
-
-
-def remove_invalid_power_rows(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove rows where LV ActivePower is 0 but Theoretical_Power_Curve is not 0.
-
-    Args:
-        df (pd.DataFrame): The DataFrame to clean.
-
-    Returns:
-        pd.DataFrame: The cleaned DataFrame.
-    """
-    df = df[~((df["LV ActivePower (kW)"] == 0) & (df["Theoretical_Power_Curve (KWh)"] != 0))]
-    return df
-
-
-def prepare_data(df: pd.DataFrame, mode: Optional[str] = None) -> pd.DataFrame:
-    """Prepare and clean the data.
-
-    Args:
-        df (pd.DataFrame): The DataFrame to prepare.
-        mode (Optional[str]): Optional mode to determine the required columns.
-                              If "score", "LV ActivePower (kW)" will be excluded.
-
-    Returns:
-        pd.DataFrame: The prepared DataFrame.
-    """
-    required_columns = [
-        "Date/Time",
-        "LV ActivePower (kW)",
-        "Wind Speed (m/s)",
-        "Theoretical_Power_Curve (KWh)",
-        "Wind Direction (°)",
-    ]
-    if mode == "score":
-        required_columns.remove("LV ActivePower (kW)")
-
-    validate_columns(df, required_columns)
-
-    df["Date/Time"] = pd.to_datetime(df["Date/Time"], format="%d %m %Y %H:%M")
-    df["Month"] = df["Date/Time"].dt.month
-    df["Hour"] = df["Date/Time"].dt.hour
-    df.drop("Date/Time", axis=1, inplace=True)
-
-    # Remove rows with months January or December
-    df = df[~df["Month"].isin([1, 12])]
-
-    # Remove outliers based on wind speed
-    Q1 = df["Wind Speed (m/s)"].quantile(0.25)
-    Q3 = df["Wind Speed (m/s)"].quantile(0.75)
-    IQR = Q3 - Q1
-    df = df[
-        ~((df["Wind Speed (m/s)"] < (Q1 - 1.5 * IQR)) | (df["Wind Speed (m/s)"] > (Q3 + 1.5 * IQR)))
-    ]
-    return df
-
-
-def split_data(
-    df: pd.DataFrame, test_size: float = 0.2, mode: Optional[str] = None
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    """Split the data into training and testing sets.
-
-    Args:
-        df (pd.DataFrame): The DataFrame to split.
-        test_size (float): Proportion of the dataset to include in the test split.
-        mode (Optional[str]): Optional mode to determine the required columns.
-                              If "score", "LV ActivePower (kW)" will be excluded.
-
-    Returns:
-        Tuple[pd.DataFrame]: The training features, training targets, testing features, and
-          testing targets.
-    """
-    df = prepare_data(df, mode)
-    df = remove_invalid_power_rows(df)
-    trainDF, testDF = train_test_split(df, test_size=test_size, random_state=1234)
-
-    X_train = trainDF.drop(columns=["LV ActivePower (kW)"]).values
-    y_train = trainDF["LV ActivePower (kW)"].values
-    X_test = testDF.drop(columns=["LV ActivePower (kW)"]).values
-    y_test = testDF["LV ActivePower (kW)"].values
-
-    return X_train, y_train, X_test, y_test
+"""
+Data processing module for handling and preparing data for machine learning.
+
+This module provides functions for:
+- Validating required columns in a DataFrame.
+- Removing rows with invalid power values.
+- Preparing and cleaning the data.
+- Splitting the data into training and testing sets.
+
+Dependencies:
+- pandas: For data manipulation and analysis.
+- sklearn: For splitting the dataset into training and testing sets.
+
+Functions:
+- validate_columns: Ensures the DataFrame contains all required columns.
+- remove_invalid_power_rows: Removes rows where LV ActivePower is 0 but
+ Theoretical_Power_Curve is not 0.
+- feature_columns: Returns the model input columns.
+- wind_speed_bounds: Returns the wind speed outlier bounds of a DataFrame.
+- prepare_data: Prepares and cleans the data.
+- split_data: Splits the data into training and testing sets.
+- split_features: Splits already prepared data into training and testing sets.
+"""
+
+from typing import Optional, Tuple
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from pipelines.window_features import (
+    WINDOW_FEATURE_COLUMNS,
+    WindowState,
+    add_window_features,
+)
+
+
+DATE_FORMAT = "%d %m %Y %H:%M"
+
+# Bump whenever prepare_data changes its output, so cached features are rebuilt
+PREPROCESS_VERSION = 1
+
+# DataFrame.attrs key of the wind speed outlier bounds applied by prepare_data
+OUTLIER_BOUNDS_ATTR = "wind_speed_bounds"
+
+# Model input columns, in the order the model was trained on
+FEATURE_COLUMNS = [
+    "Wind Speed (m/s)",
+    "Theoretical_Power_Curve (KWh)",
+    "Wind Direction (°)",
+    "Month",
+    "Hour",
+]
+
+
+def feature_columns(window_features: bool = False) -> list:
+    """Return the model input columns, with the lag and rolling wind features if enabled.
+
+    Args:
+        window_features (bool): Whether the model uses the window features.
+
+    Returns:
+        list: The model input columns in training order.
+    """
+    if window_features:
+        return FEATURE_COLUMNS + WINDOW_FEATURE_COLUMNS
+    return FEATURE_COLUMNS
+
+
+def validate_columns(df: pd.DataFrame, required_columns: list) -> None:
+    """Ensure the DataFrame contains all required columns.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to validate.
+        required_columns (list): A list of required column names.
+
+    Raises:
+        ValueError: If any required column is missing.
+    """
+    for col in required_columns:
+        if col not in df.columns:
+            raise ValueError(f"Missing required column: {col}")
+
+
+def remove_invalid_power_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove rows where LV ActivePower is 0 but Theoretical_Power_Curve is not 0.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to clean.
+
+    Returns:
+        pd.DataFrame: The cleaned DataFrame.
+    """
+    df = df[~((df["LV ActivePower (kW)"] == 0) & (df["Theoretical_Power_Curve (KWh)"] != 0))]
+    return df
+
+
+def wind_speed_bounds(df: pd.DataFrame) -> Tuple[float, float]:
+    """Return the wind speed outlier bounds, 1.5 IQR below and above the quartiles.
+
+    Args:
+        df (pd.DataFrame): The DataFrame with a wind speed column.
+
+    Returns:
+        Tuple[float, float]: The lowest and highest wind speed kept.
+    """
+    Q1 = df["Wind Speed (m/s)"].quantile(0.25)
+    Q3 = df["Wind Speed (m/s)"].quantile(0.75)
+    IQR = Q3 - Q1
+    return float(Q1 - 1.5 * IQR), float(Q3 + 1.5 * IQR)
+
+
+def prepare_data(
+    df: pd.DataFrame,
+    mode: Optional[str] = None,
+    window_state: Optional[WindowState] = None,
+    outlier_bounds: Optional[Tuple[float, float]] = None,
+) -> pd.DataFrame:
+    """Prepare and clean the data.
+
+    The wind speed outlier bounds applied are kept in
+    `df.attrs[OUTLIER_BOUNDS_ATTR]`, so the bounds of the training data can be
+    recorded with the model and reused when scoring.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to prepare.
+        mode (Optional[str]): Optional mode to determine the required columns.
+                              If "score", "LV ActivePower (kW)" will be excluded.
+        window_state (Optional[WindowState]): When given, lag and rolling wind features
+                              are added, continuing the series carried in the state.
+        outlier_bounds (Optional[Tuple[float, float]]): Fixed wind speed outlier bounds.
+                              Computed from `df` when not given.
+
+    Returns:
+        pd.DataFrame: The prepared DataFrame.
+    """
+    required_columns = [
+        "Date/Time",
+        "LV ActivePower (kW)",
+        "Wind Speed (m/s)",
+        "Theoretical_Power_Curve (KWh)",
+        "Wind Direction (°)",
+    ]
+    if mode == "score":
+        required_columns.remove("LV ActivePower (kW)")
+
+    validate_columns(df, required_columns)
+
+    df["Date/Time"] = pd.to_datetime(df["Date/Time"], format=DATE_FORMAT)
+    df["Month"] = df["Date/Time"].dt.month
+    df["Hour"] = df["Date/Time"].dt.hour
+
+    # Add lag and rolling wind features before any rows are filtered out
+    if window_state is not None:
+        df = add_window_features(df, window_state)
+    df.drop("Date/Time", axis=1, inplace=True)
+
+    # Remove rows with months January or December
+    df = df[~df["Month"].isin([1, 12])]
+
+    # Remove outliers based on wind speed
+    if outlier_bounds is None:
+        outlier_bounds = wind_speed_bounds(df)
+    low, high = outlier_bounds
+    df = df[~((df["Wind Speed (m/s)"] < low) | (df["Wind Speed (m/s)"] > high))]
+    df.attrs[OUTLIER_BOUNDS_ATTR] = (low, high)
+    return df
+
+
+def split_data(
+    df: pd.DataFrame, test_size: float = 0.2, mode: Optional[str] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Split the data into training and testing sets.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to split.
+        test_size (float): Proportion of the dataset to include in the test split.
+        mode (Optional[str]): Optional mode to determine the required columns.
+                              If "score", "LV ActivePower (kW)" will be excluded.
+
+    Returns:
+        Tuple[pd.DataFrame]: The training features, training targets, testing features, and
+          testing targets.
+    """
+    df = prepare_data(df, mode)
+    return split_features(df, test_size)
+
+
+def split_features(
+    df: pd.DataFrame, test_size: float = 0.2
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Split already prepared data into training and testing sets.
+
+    Args:
+        df (pd.DataFrame): The DataFrame returned by `prepare_data`.
+        test_size (float): Proportion of the dataset to include in the test split.
+
+    Returns:
+        Tuple[pd.DataFrame]: The training features, training targets, testing features, and
+          testing targets.
+    """
+    df = remove_invalid_power_rows(df)
+    trainDF, testDF = train_test_split(df, test_size=test_size, random_state=1234)
+
+    X_train = trainDF.drop(columns=["LV ActivePower (kW)"]).values
+    y_train = trainDF["LV ActivePower (kW)"].values
+    X_test = testDF.drop(columns=["LV ActivePower (kW)"]).values
+    y_test = testDF["LV ActivePower (kW)"].values
+
+    return X_train, y_train, X_test, y_test
@@ -0,0 +1,231 @@
+"""
+Quantized lookup-table surrogate of the champion model.
+
+This module precomputes the model predictions over a quantized grid of the five
+model inputs and answers scoring requests with constant-time table lookups.
+The continuous inputs (wind speed, theoretical power, wind direction) are
+linearly interpolated between grid points, the integer inputs (month, hour)
+are looked up exactly.
+
+Classes:
+- LookupTableSurrogate: Grid of precomputed predictions with interpolation.
+
+Functions:
+- build_surrogate: Build a surrogate from a model and report its holdout error.
+- log_surrogate: Store a surrogate as an artifact of the active MLflow run.
+- load_surrogate: Load the surrogate stored with a model version.
+- surrogate_or_model: Pick the surrogate when it met its error bound.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import mlflow
+import numpy as np
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+
+from utils._tracking import AsyncMlflowLogger
+
+
+SURROGATE_DIR = "surrogate"
+SURROGATE_FILE = "lookup_table.npz"
+
+# Number of leading model inputs that are continuous; the rest are integers
+CONTINUOUS_FEATURES = 3
+
+
+class LookupTableSurrogate:
+    """Precomputed model predictions over a quantized feature grid."""
+
+    def __init__(
+        self, axes: List[np.ndarray], table: np.ndarray, metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        self.axes = axes
+        self.table = table
+        self.metadata = metadata or {}
+
+    @property
+    def within_bound(self) -> bool:
+        """Whether the holdout error met the configured bound at build time."""
+        return bool(self.metadata.get("within_bound", False))
+
+    def _corners(self, X: np.ndarray):
+        """Yield (flat table index, weight) for every interpolation corner."""
+        base = []
+        fractions = []
+        for i, axis in enumerate(self.axes):
+            if i < CONTINUOUS_FEATURES:
+                pos = np.interp(X[:, i], axis, np.arange(len(axis), dtype=np.float64))
+                lower = np.minimum(np.floor(pos).astype(np.int64), len(axis) - 2)
+                base.append(lower)
+                fractions.append(pos - lower)
+            else:
+                idx = np.rint(X[:, i]).astype(np.int64) - int(axis[0])
+                base.append(np.clip(idx, 0, len(axis) - 1))
+
+        for corner in range(2**CONTINUOUS_FEATURES):
+            index = list(base)
+            weight = np.ones(len(X))
+            for i in range(CONTINUOUS_FEATURES):
+                if corner >> i & 1:
+                    index[i] = base[i] + 1
+                    weight = weight * fractions[i]
+                else:
+                    weight = weight * (1.0 - fractions[i])
+            yield np.ravel_multi_index(index, self.table.shape), weight
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Predict by interpolating the precomputed table.
+
+        Args:
+            X (Any): Feature matrix (DataFrame or array) in model input order.
+
+        Returns:
+            np.ndarray: The surrogate predictions.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        flat = self.table.ravel()
+        predictions = np.zeros(len(X))
+        for index, weight in self._corners(X):
+            predictions += weight * flat[index]
+        return predictions
+
+    def save(self, path: Path) -> None:
+        """Save the surrogate to a compressed `.npz` file."""
+        arrays = {f"axis_{i}": axis for i, axis in enumerate(self.axes)}
+        np.savez_compressed(path, table=self.table, metadata=json.dumps(self.metadata), **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "LookupTableSurrogate":
+        """Load a surrogate saved with `save`."""
+        with np.load(path) as data:
+            axes = [data[f"axis_{i}"] for i in range(data["table"].ndim)]
+            return cls(axes, data["table"], json.loads(str(data["metadata"])))
+
+
+def build_surrogate(
+    model: Any,
+    X_train: np.ndarray,
+    X_holdout: np.ndarray,
+    grid_points: Sequence[int],
+    rmse_bound: float,
+    max_error_bound: float,
+    batch_size: int = 500_000,
+) -> LookupTableSurrogate:
+    """
+    Precompute model predictions over a quantized grid of the training range.
+
+    The continuous inputs get `grid_points` evenly spaced values between their
+    training minimum and maximum; the integer inputs get every value in their
+    training range. The surrogate is then compared with the model on the holdout.
+
+    Args:
+        model (Any): The fitted model to approximate.
+        X_train (np.ndarray): Training features, used for the grid ranges.
+        X_holdout (np.ndarray): Holdout features used to measure the error.
+        grid_points (Sequence[int]): Grid size for each continuous input.
+        rmse_bound (float): Maximum holdout RMSE for the surrogate to be used.
+        max_error_bound (float): Maximum holdout absolute error for it to be used.
+        batch_size (int): Number of grid rows predicted per model call.
+
+    Returns:
+        LookupTableSurrogate: The surrogate, with its holdout error in `metadata`.
+    """
+    axes = []
+    for i in range(X_train.shape[1]):
+        low, high = X_train[:, i].min(), X_train[:, i].max()
+        if i < CONTINUOUS_FEATURES:
+            axes.append(np.linspace(low, high, grid_points[i]))
+        else:
+            axes.append(np.arange(int(low), int(high) + 1, dtype=np.float64))
+
+    shape = tuple(len(axis) for axis in axes)
+    table = np.empty(int(np.prod(shape)), dtype=np.float32)
+    for start in range(0, len(table), batch_size):
+        end = min(start + batch_size, len(table))
+        grid_index = np.unravel_index(np.arange(start, end), shape)
+        grid = np.column_stack([axis[idx] for axis, idx in zip(axes, grid_index)])
+        table[start:end] = model.predict(grid)
+
+    surrogate = LookupTableSurrogate(axes, table.reshape(shape))
+
+    errors = surrogate.predict(X_holdout) - model.predict(X_holdout)
+    rmse = float(np.sqrt(np.mean(errors**2)))
+    max_error = float(np.max(np.abs(errors)))
+    surrogate.metadata = {
+        "rmse": rmse,
+        "max_abs_error": max_error,
+        "rmse_bound": rmse_bound,
+        "max_error_bound": max_error_bound,
+        "within_bound": rmse <= rmse_bound and max_error <= max_error_bound,
+        "cells": int(table.size),
+    }
+    print(
+        f"Surrogate built with {table.size} cells: holdout RMSE {rmse:.3f}, "
+        f"max abs error {max_error:.3f}, within bound: {surrogate.within_bound}"
+    )
+    return surrogate
+
+
+def log_surrogate(surrogate: LookupTableSurrogate, tracker: AsyncMlflowLogger) -> None:
+    """
+    Store a surrogate and its holdout error with the active MLflow run.
+
+    Args:
+        surrogate (LookupTableSurrogate): The surrogate to store.
+        tracker (AsyncMlflowLogger): The run's logger, used for the error metrics.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / SURROGATE_FILE
+        surrogate.save(path)
+        mlflow.log_artifact(str(path), artifact_path=SURROGATE_DIR)
+    tracker.log_metrics(
+        {
+            "surrogate_rmse": surrogate.metadata["rmse"],
+            "surrogate_max_abs_error": surrogate.metadata["max_abs_error"],
+        }
+    )
+
+
+def load_surrogate(model_name: str, alias: str) -> Optional[LookupTableSurrogate]:
+    """
+    Load the surrogate stored with the model version behind an alias.
+
+    Args:
+        model_name (str): The name of the registered model.
+        alias (str): The alias of the model version (e.g. "champion").
+
+    Returns:
+        Optional[LookupTableSurrogate]: The surrogate, or None if the version has none.
+    """
+    client = MlflowClient()
+    run_id = client.get_model_version_by_alias(model_name, alias).run_id
+    try:
+        local_path = mlflow.artifacts.download_artifacts(
+            run_id=run_id, artifact_path=f"{SURROGATE_DIR}/{SURROGATE_FILE}"
+        )
+    except (MlflowException, OSError):
+        print(f"No surrogate stored for '{model_name}@{alias}'.")
+        return None
+    return LookupTableSurrogate.load(Path(local_path))
+
+
+def surrogate_or_model(surrogate: Optional[LookupTableSurrogate], load_model: Any) -> Any:
+    """
+    Pick the surrogate when it met its error bound, otherwise the full model.
+
+    Args:
+        surrogate (Optional[LookupTableSurrogate]): The stored surrogate, if any.
+        load_model (Any): Callable loading the full model, only called on fallback.
+
+    Returns:
+        Any: An object with a `predict` method.
+    """
+    if surrogate is not None and surrogate.within_bound:
+        print("Scoring with the lookup-table surrogate.")
+        return surrogate
+    print("Surrogate unavailable or outside its error bound; scoring with the full model.")
+    return load_model()
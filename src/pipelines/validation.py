@@ -0,0 +1,307 @@
+"""
+Declarative data quality validation for the raw turbine data.
+
+This module checks every schema and range rule in one vectorized pass per
+chunk and, in the same pass, collects per-column null counts, min/max values
+and violation counts. Invalid rows are handled by a policy:
+
+- "fail": raise a ValueError describing the violations.
+- "drop": remove the invalid rows.
+- "quarantine": remove the invalid rows and publish them for inspection.
+
+The `Date/Time` column is parsed during validation and left parsed, so
+`prepare_data` does not parse it again.
+
+Classes:
+- ColumnRule: Schema and range rule for one column.
+- ValidationReport: Per-column statistics and violation counts over all chunks.
+- DataValidator: Callable applying the rules and policy to a DataFrame.
+
+Functions:
+- validate_chunk: Check one chunk against the rules and update a report.
+- validate_data: Check a DataFrame chunk by chunk and apply a policy.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipelines.post_process import publish_data
+from pipelines.pre_process import DATE_FORMAT, validate_columns
+
+
+POLICIES = ("fail", "drop", "quarantine")
+
+# Bump when SCHEMA changes, so feature store entries validated with the old rules are rebuilt
+VALIDATION_VERSION = 1
+
+
+class ColumnRule(NamedTuple):
+    """Schema and range rule for one column."""
+
+    name: str
+    metric_name: str
+    kind: str = "numeric"
+    min: Optional[float] = None
+    max: Optional[float] = None
+    nullable: bool = False
+    required: bool = True
+
+
+SCHEMA = [
+    ColumnRule("Date/Time", "date_time", kind="datetime"),
+    ColumnRule("LV ActivePower (kW)", "active_power", min=-50.0, max=4000.0, required=False),
+    ColumnRule("Wind Speed (m/s)", "wind_speed", min=0.0, max=40.0),
+    ColumnRule("Theoretical_Power_Curve (KWh)", "theoretical_power", min=0.0, max=4000.0),
+    ColumnRule("Wind Direction (°)", "wind_direction", min=0.0, max=360.0),
+]
+
+
+class ValidationReport:
+    """Per-column null counts, min/max and violation counts over all chunks."""
+
+    def __init__(self, rules: List[ColumnRule]) -> None:
+        self.rules = rules
+        self.rows = 0
+        self.invalid_rows = 0
+        self.nulls = {rule.name: 0 for rule in rules}
+        self.invalid_values = {rule.name: 0 for rule in rules}
+        self.out_of_range = {rule.name: 0 for rule in rules}
+        self.min: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+
+    def update_range(self, name: str, low: float, high: float) -> None:
+        """Widen the observed min/max of a column."""
+        self.min[name] = min(self.min.get(name, low), low)
+        self.max[name] = max(self.max.get(name, high), high)
+
+    def to_metrics(self) -> Dict[str, float]:
+        """Return the statistics as MLflow metrics prefixed with `dq_`."""
+        metrics = {"dq_rows": float(self.rows), "dq_invalid_rows": float(self.invalid_rows)}
+        for rule in self.rules:
+            name = rule.metric_name
+            metrics[f"dq_nulls_{name}"] = float(self.nulls[rule.name])
+            metrics[f"dq_invalid_{name}"] = float(self.invalid_values[rule.name])
+            metrics[f"dq_out_of_range_{name}"] = float(self.out_of_range[rule.name])
+            if rule.name in self.min and rule.kind == "numeric":
+                metrics[f"dq_min_{name}"] = self.min[rule.name]
+                metrics[f"dq_max_{name}"] = self.max[rule.name]
+        return metrics
+
+    def to_dict(self) -> Dict[str, Any]:
+        numeric = [rule.name for rule in self.rules if rule.kind == "numeric"]
+        return {
+            "rules": [rule.name for rule in self.rules],
+            "rows": self.rows,
+            "invalid_rows": self.invalid_rows,
+            "nulls": self.nulls,
+            "invalid_values": self.invalid_values,
+            "out_of_range": self.out_of_range,
+            "min": {name: float(self.min[name]) for name in numeric if name in self.min},
+            "max": {name: float(self.max[name]) for name in numeric if name in self.max},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ValidationReport":
+        report = cls([rule for rule in SCHEMA if rule.name in data["rules"]])
+        report.rows = data["rows"]
+        report.invalid_rows = data["invalid_rows"]
+        report.nulls = data["nulls"]
+        report.invalid_values = data["invalid_values"]
+        report.out_of_range = data["out_of_range"]
+        report.min = data["min"]
+        report.max = data["max"]
+        return report
+
+    def summary(self) -> str:
+        """Return a one-line description of the violations per column."""
+        parts = []
+        for rule in self.rules:
+            nulls = 0 if rule.nullable else self.nulls[rule.name]
+            counts = (nulls, self.invalid_values[rule.name], self.out_of_range[rule.name])
+            if any(counts):
+                parts.append(
+                    f"{rule.name}: {counts[0]} null, {counts[1]} invalid, {counts[2]} out of range"
+                )
+        return f"{self.invalid_rows} of {self.rows} rows invalid ({'; '.join(parts)})"
+
+
+def validate_chunk(
+    df: pd.DataFrame, rules: List[ColumnRule], report: ValidationReport
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Check one chunk against the rules, updating the report in the same pass.
+
+    Args:
+        df (pd.DataFrame): The chunk to check; typically a row-slice view.
+        rules (List[ColumnRule]): The rules for the columns present in `df`.
+        report (ValidationReport): The report to update.
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, np.ndarray]]: Boolean mask of the valid
+          rows, and the parsed values of the columns that were not already
+          datetime or numeric.
+    """
+    valid = np.ones(len(df), dtype=bool)
+    parsed_columns = {}
+    for rule in rules:
+        raw = df[rule.name]
+        null = raw.isna().to_numpy()
+
+        if rule.kind == "datetime":
+            parsed = raw
+            if not pd.api.types.is_datetime64_any_dtype(raw):
+                parsed = pd.to_datetime(raw, format=DATE_FORMAT, errors="coerce")
+                parsed_columns[rule.name] = parsed.to_numpy()
+            values = parsed.to_numpy()
+            invalid = np.isnat(values) & ~null
+            out_of_range = np.zeros(len(df), dtype=bool)
+            present = values[~np.isnat(values)]
+        else:
+            parsed = raw
+            if not pd.api.types.is_numeric_dtype(raw):
+                parsed = pd.to_numeric(raw, errors="coerce")
+                parsed_columns[rule.name] = parsed.to_numpy(dtype=np.float64)
+            values = parsed.to_numpy(dtype=np.float64)
+            invalid = np.isnan(values) & ~null
+            with np.errstate(invalid="ignore"):
+                out_of_range = np.zeros(len(df), dtype=bool)
+                if rule.min is not None:
+                    out_of_range |= values < rule.min
+                if rule.max is not None:
+                    out_of_range |= values > rule.max
+            present = values[~np.isnan(values)]
+
+        if len(present):
+            report.update_range(rule.name, present.min(), present.max())
+        report.nulls[rule.name] += int(null.sum())
+        report.invalid_values[rule.name] += int(invalid.sum())
+        report.out_of_range[rule.name] += int(out_of_range.sum())
+
+        bad = invalid | out_of_range
+        if not rule.nullable:
+            bad |= null
+        valid &= ~bad
+
+    report.rows += len(df)
+    report.invalid_rows += int((~valid).sum())
+    return valid, parsed_columns
+
+
+def validate_data(
+    df: pd.DataFrame,
+    mode: Optional[str] = None,
+    policy: str = "fail",
+    chunksize: int = 1_000_000,
+) -> Tuple[pd.DataFrame, pd.DataFrame, ValidationReport]:
+    """
+    Check a raw DataFrame against the schema chunk by chunk and apply a policy.
+
+    Chunks are row-slice views of `df`, so only the masks and parsed values are
+    allocated; columns that needed parsing are replaced in `df` once at the end,
+    and rows are only copied when some of them are invalid.
+
+    Args:
+        df (pd.DataFrame): The raw data; its unparsed columns are replaced in place.
+        mode (Optional[str]): If "score", "LV ActivePower (kW)" is not required.
+        policy (str): "fail", "drop" or "quarantine".
+        chunksize (int): Number of rows checked per vectorized pass.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, ValidationReport]: The valid rows with
+          their columns parsed, the invalid rows and the validation report.
+
+    Raises:
+        ValueError: If the policy is unknown, a required column is missing, or
+          the policy is "fail" and any row is invalid.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown validation policy: {policy}")
+
+    validate_columns(df, [rule.name for rule in SCHEMA if rule.required or mode != "score"])
+    rules = [rule for rule in SCHEMA if rule.name in df.columns]
+    report = ValidationReport(rules)
+
+    valid = np.empty(len(df), dtype=bool)
+    parsed: Dict[str, np.ndarray] = {}
+    for start in range(0, len(df), chunksize):
+        end = min(start + chunksize, len(df))
+        valid[start:end], chunk_parsed = validate_chunk(df.iloc[start:end], rules, report)
+        for name, values in chunk_parsed.items():
+            if name not in parsed:
+                parsed[name] = np.empty(len(df), dtype=values.dtype)
+            parsed[name][start:end] = values
+    for name, values in parsed.items():
+        df[name] = values
+
+    print(f"Data validation: {report.summary()}")
+    if report.invalid_rows and policy == "fail":
+        raise ValueError(f"Data validation failed: {report.summary()}")
+    if not report.invalid_rows:
+        return df, df.iloc[:0], report
+    # take() copies the selected rows into a new frame, not a view of `df`
+    return df.take(np.flatnonzero(valid)), df.take(np.flatnonzero(~valid)), report
+
+
+class DataValidator:
+    """Validate raw data with a policy and keep the report for logging.
+
+    Instances are callables taking the raw DataFrame and returning the valid
+    rows, so they can be passed wherever the raw data is loaded. With the
+    "quarantine" policy the invalid rows are published to
+    `output_files/quarantine/`.
+
+    Args:
+        mode (Optional[str]): The `prepare_data` mode ("train" or "score").
+        policy (str): "fail", "drop" or "quarantine".
+        bucket_name (Optional[str]): The S3 bucket receiving quarantined rows.
+        source (str): The name of the validated data file.
+        chunksize (int): Number of rows checked per vectorized pass.
+        publish (bool): Whether quarantined rows are published; disable it when
+          the same data was already validated and quarantined by another stage.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        policy: str = "fail",
+        bucket_name: Optional[str] = None,
+        source: str = "data",
+        chunksize: int = 1_000_000,
+        publish: bool = True,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown validation policy: {policy}")
+        self.mode = mode
+        self.policy = policy
+        self.bucket_name = bucket_name
+        self.source = source
+        self.chunksize = chunksize
+        self.publish = publish
+        self.report: Optional[ValidationReport] = None
+
+    @property
+    def cache_tag(self) -> str:
+        """Return the tag identifying data validated with this policy and rules version."""
+        return f"{self.policy}-r{VALIDATION_VERSION}"
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        valid, invalid, self.report = validate_data(df, self.mode, self.policy, self.chunksize)
+        if self.policy == "quarantine" and self.publish and not invalid.empty:
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+            file_name = f"quarantine/{Path(self.source).stem}-{stamp}"
+            publish_data(invalid, self.bucket_name, file_name=file_name)
+        return valid
+
+    def restore(self, report: Optional[Dict[str, Any]]) -> None:
+        """Restore the report stored when cached data was validated."""
+        if report is not None:
+            self.report = ValidationReport.from_dict(report)
+            print(f"Data validation (cached): {self.report.summary()}")
+
+    def metrics(self) -> Dict[str, float]:
+        """Return the report of the last call as MLflow metrics, or {} if it has not run."""
+        return self.report.to_metrics() if self.report is not None else {}
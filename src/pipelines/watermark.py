@@ -0,0 +1,151 @@
+"""
+Watermark state for incremental batch scoring.
+
+This module keeps a small JSON state object per scoring source that records the
+latest `Date/Time` value already scored. The state lives either in the bucket
+under `state/watermarks/` or in a local directory, so that each scoring run only
+has to process rows newer than the previous run.
+
+Functions:
+- read_watermark_state: Read the whole stored state object for a source.
+- read_watermark: Read the stored high-watermark for a source.
+- write_watermark: Persist a new high-watermark for a source.
+- filter_new_rows: Keep only the rows newer than a watermark.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipelines.pre_process import DATE_FORMAT
+from utils._storage import get_storage
+
+
+WATERMARK_PREFIX = "state/watermarks"
+
+
+def _state_key(source: str) -> str:
+    """Return the state object name for a source file."""
+    return f"{Path(source).stem}.json"
+
+
+def read_watermark_state(source: str, bucket_name: str, store: str = "s3") -> Dict[str, Any]:
+    """
+    Read the whole stored state object for a scoring source.
+
+    Args:
+        source (str): The name of the scored data file (e.g. `test.csv`).
+        bucket_name (str): The bucket holding the state when `store` is "s3".
+        store (str): "s3" or a local directory path holding the state files.
+
+    Returns:
+        Dict[str, Any]: The stored state, or an empty dict on the first run.
+    """
+    if store == "s3":
+        storage = get_storage(bucket_name)
+        try:
+            body = storage.get(f"{WATERMARK_PREFIX}/{_state_key(source)}")
+        except FileNotFoundError:
+            print(f"No watermark found for {source}; scoring all rows.")
+            return {}
+        state = json.loads(body.decode("utf-8"))
+    else:
+        state_path = Path(store) / _state_key(source)
+        if not state_path.is_file():
+            print(f"No watermark found for {source}; scoring all rows.")
+            return {}
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    return state
+
+
+def read_watermark(source: str, bucket_name: str, store: str = "s3") -> Optional[pd.Timestamp]:
+    """
+    Read the stored `Date/Time` high-watermark for a scoring source.
+
+    Args:
+        source (str): The name of the scored data file (e.g. `test.csv`).
+        bucket_name (str): The bucket holding the state when `store` is "s3".
+        store (str): "s3" or a local directory path holding the state files.
+
+    Returns:
+        Optional[pd.Timestamp]: The last scored timestamp, or None on the first run.
+    """
+    state = read_watermark_state(source, bucket_name, store)
+    if not state.get("watermark"):
+        return None
+
+    watermark = pd.Timestamp(state["watermark"])
+    print(f"Watermark for {source}: {watermark}")
+    return watermark
+
+
+def write_watermark(
+    source: str,
+    watermark: Optional[pd.Timestamp],
+    bucket_name: str,
+    store: str = "s3",
+    **details: Any,
+) -> None:
+    """
+    Persist the `Date/Time` high-watermark for a scoring source.
+
+    Args:
+        source (str): The name of the scored data file (e.g. `test.csv`).
+        watermark (Optional[pd.Timestamp]): The latest timestamp that has been read,
+          or None if no row read so far had a valid timestamp.
+        bucket_name (str): The bucket holding the state when `store` is "s3".
+        store (str): "s3" or a local directory path holding the state files.
+        **details: Extra fields recorded in the state object (e.g. the output part).
+    """
+    state: Dict[str, Any] = {
+        "source": source,
+        "watermark": None if watermark is None else watermark.isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        **details,
+    }
+    body = json.dumps(state, indent=2)
+
+    if store == "s3":
+        storage = get_storage(bucket_name)
+        storage.put(f"{WATERMARK_PREFIX}/{_state_key(source)}", body.encode("utf-8"))
+    else:
+        state_path = Path(store) / _state_key(source)
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        state_path.write_text(body, encoding="utf-8")
+
+    print(f"Watermark for {source} advanced to {watermark}")
+
+
+def filter_new_rows(
+    df: pd.DataFrame, watermark: Optional[pd.Timestamp]
+) -> Tuple[pd.DataFrame, Optional[pd.Timestamp]]:
+    """
+    Keep only the rows whose `Date/Time` is newer than the watermark.
+
+    The `Date/Time` column is parsed in place so that `prepare_data` does not
+    have to parse it a second time. Rows with unparseable values are always
+    kept, with the column left unparsed, so data validation reports them as
+    invalid and applies its policy.
+
+    Args:
+        df (pd.DataFrame): Raw data containing a `Date/Time` column.
+        watermark (Optional[pd.Timestamp]): The last scored timestamp, if any.
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[pd.Timestamp]]: The new rows and their
+          maximum parsed timestamp (None when there are no new rows).
+    """
+    parsed = pd.to_datetime(df["Date/Time"], format=DATE_FORMAT, errors="coerce")
+    if not (parsed.isna() & df["Date/Time"].notna()).any():
+        df["Date/Time"] = parsed
+    if watermark is not None:
+        # take() returns a new frame rather than a slice, so validation can parse it in place
+        new = np.flatnonzero((parsed.isna() | (parsed > watermark)).to_numpy())
+        df, parsed = df.take(new), parsed.take(new)
+    if df.empty:
+        return df, None
+    return df, parsed.max()
@@ -0,0 +1,108 @@
+"""
+Lag and rolling-window wind features over the time-ordered series.
+
+This module adds short-term wind history to each row: lagged wind speeds and
+rolling means and standard deviations over the preceding observations. The
+tail of the series is carried in a `WindowState` from one chunk to the next,
+so the features are identical whether the data is processed whole or in
+pieces, and training and scoring share the same implementation.
+
+Classes:
+- WindowState: History carried across chunk boundaries.
+
+Functions:
+- add_window_features: Add lag and rolling features to a time-ordered chunk.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+WINDOW_SOURCE = "Wind Speed (m/s)"
+LAGS = (1, 2, 3)
+ROLLING_WINDOWS = (3, 6)
+
+WINDOW_FEATURE_COLUMNS = [f"Wind Speed Lag {lag}" for lag in LAGS] + [
+    f"Wind Speed Rolling {stat} {window}" for window in ROLLING_WINDOWS for stat in ("Mean", "Std")
+]
+
+# Number of past observations needed to compute every feature of a row
+HISTORY = max(max(LAGS), max(ROLLING_WINDOWS) - 1)
+
+
+class WindowState:
+    """Tail of the wind series carried from one chunk to the next."""
+
+    def __init__(
+        self, tail: Optional[np.ndarray] = None, last_timestamp: Optional[pd.Timestamp] = None
+    ) -> None:
+        self.tail = np.empty(0) if tail is None else np.asarray(tail, dtype=np.float64)
+        self.last_timestamp = last_timestamp
+
+    def to_dict(self) -> Dict[str, Any]:
+        last_timestamp = self.last_timestamp
+        return {
+            "tail": self.tail.tolist(),
+            "last_timestamp": None if last_timestamp is None else last_timestamp.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "WindowState":
+        if not data:
+            return cls()
+        last_timestamp = data["last_timestamp"]
+        return cls(data["tail"], None if last_timestamp is None else pd.Timestamp(last_timestamp))
+
+
+def add_window_features(df: pd.DataFrame, state: WindowState) -> pd.DataFrame:
+    """
+    Add lag and rolling wind speed features to a chunk of the series.
+
+    Rows are sorted by `Date/Time` and must all be later than the previous
+    chunk. At the very start of the series, the first observation is repeated
+    as history, so every row gets a value.
+
+    Args:
+        df (pd.DataFrame): A chunk with parsed `Date/Time` and wind speed columns.
+        state (WindowState): History from the previous chunk; updated in place.
+
+    Returns:
+        pd.DataFrame: The sorted chunk with the columns in `WINDOW_FEATURE_COLUMNS`.
+
+    Raises:
+        ValueError: If the chunk overlaps or precedes the previous chunk.
+    """
+    df = df.sort_values("Date/Time", kind="stable")
+    if df.empty:
+        return df.assign(**{col: np.empty(0) for col in WINDOW_FEATURE_COLUMNS})
+    if state.last_timestamp is not None and df["Date/Time"].iloc[0] <= state.last_timestamp:
+        raise ValueError(
+            f"Chunk starting at {df['Date/Time'].iloc[0]} is not after the previous chunk "
+            f"ending at {state.last_timestamp}"
+        )
+
+    values = df[WINDOW_SOURCE].to_numpy(dtype=np.float64)
+    history = state.tail
+    if len(history) < HISTORY:
+        first = history[0] if len(history) else values[0]
+        history = np.concatenate([np.full(HISTORY - len(history), first), history])
+    series = np.concatenate([history, values])
+    n = len(values)
+
+    features = {}
+    for lag in LAGS:
+        start = HISTORY - lag
+        features[f"Wind Speed Lag {lag}"] = series[start:][:n]
+    for window in ROLLING_WINDOWS:
+        # Each window covers the current row and the (window - 1) rows before it
+        start = HISTORY - window + 1
+        windows = sliding_window_view(series[start:], window)
+        features[f"Wind Speed Rolling Mean {window}"] = windows.mean(axis=1)
+        features[f"Wind Speed Rolling Std {window}"] = windows.std(axis=1, ddof=1)
+
+    state.tail = series[-HISTORY:]
+    state.last_timestamp = df["Date/Time"].iloc[-1]
+    return df.assign(**features)
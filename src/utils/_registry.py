@@ -0,0 +1,106 @@
+"""Model Registry Access Layer
+
+    Wraps the MLflow client for one registered model so that alias and version
+    lookups take a constant number of round trips, however many versions the
+    registry holds.
+
+    Classes:
+        RegistryClient: Cached alias and version tag lookups, ordered version
+            queries and batched alias updates for a registered model.
+"""
+
+from typing import Dict, Optional
+
+from mlflow.entities.model_registry import ModelVersion
+from mlflow.tracking import MlflowClient
+
+
+class RegistryClient:
+    """Registry operations for a single registered model.
+
+    All aliases are read with one `get_registered_model` call and memoized for
+    the lifetime of the object. Alias changes are staged locally, so later
+    lookups see them immediately, and `commit` sends only the net changes.
+
+    Args:
+        model_name (str): The name of the registered model.
+        client (Optional[MlflowClient]): Client used for the registry calls.
+    """
+
+    def __init__(self, model_name: str, client: Optional[MlflowClient] = None) -> None:
+        self.model_name = model_name
+        self.client = client or MlflowClient()
+        self._aliases: Optional[Dict[str, str]] = None
+        self._staged: Dict[str, Optional[str]] = {}
+        self._version_tags: Dict[str, Dict[str, str]] = {}
+
+    def _search(self, max_results: int) -> list:
+        return list(
+            self.client.search_model_versions(
+                f"name='{self.model_name}'",
+                max_results=max_results,
+                order_by=["version_number DESC"],
+            )
+        )
+
+    def latest_version(self) -> Optional[ModelVersion]:
+        """Return the highest version of the model, or None if it has no versions."""
+        versions = self._search(max_results=1)
+        return versions[0] if versions else None
+
+    def has_multiple_versions(self) -> bool:
+        """Return whether the model has more than one version."""
+        return len(self._search(max_results=2)) > 1
+
+    def aliases(self) -> Dict[str, str]:
+        """Return the alias-to-version mapping, including staged changes."""
+        if self._aliases is None:
+            registered_model = self.client.get_registered_model(self.model_name)
+            self._aliases = {alias: str(v) for alias, v in registered_model.aliases.items()}
+        merged = dict(self._aliases)
+        for alias, version in self._staged.items():
+            if version is None:
+                merged.pop(alias, None)
+            else:
+                merged[alias] = version
+        return merged
+
+    def version_by_alias(self, alias: str) -> Optional[str]:
+        """Return the version behind an alias, or None if the alias is not set."""
+        return self.aliases().get(alias)
+
+    def version_tags(self, version: str) -> Dict[str, str]:
+        """Return the tags of a model version, read once per version."""
+        version = str(version)
+        if version not in self._version_tags:
+            model_version = self.client.get_model_version(self.model_name, version)
+            self._version_tags[version] = dict(model_version.tags)
+        return self._version_tags[version]
+
+    def set_version_tag(self, version: str, key: str, value: str) -> None:
+        """Set a tag on a model version."""
+        self.client.set_model_version_tag(self.model_name, str(version), key, value)
+        self._version_tags.pop(str(version), None)
+
+    def set_alias(self, alias: str, version: str) -> None:
+        """Stage pointing an alias at a version."""
+        self._staged[alias] = str(version)
+
+    def delete_alias(self, alias: str) -> None:
+        """Stage removing an alias."""
+        self._staged[alias] = None
+
+    def commit(self) -> None:
+        """Send the net staged alias changes to the registry."""
+        if self._aliases is None:
+            self.aliases()
+        current = self._aliases
+        for alias, version in self._staged.items():
+            if version is None:
+                if alias in current:
+                    self.client.delete_registered_model_alias(self.model_name, alias)
+                    current.pop(alias)
+            elif current.get(alias) != version:
+                self.client.set_registered_model_alias(self.model_name, alias, version)
+                current[alias] = version
+        self._staged.clear()
@@ -0,0 +1,242 @@
+"""Object Storage Backends
+
+    Gives the pipelines one interface to the bucket holding data, results,
+    state and model artifacts. The backend is selected by the `s3_bucket`
+    value of the `conf/*.env` file, so the same pipelines run against S3 or
+    fully offline:
+
+        s3_bucket=mlops-aws-windoutput        S3 bucket (also `s3://name`)
+        s3_bucket=file:///var/tmp/windoutput  Local directory, read via mmap
+        s3_bucket=memory://bench              In-process dictionary
+
+    Every backend supports ranged reads, so appended data can be read from
+    a byte offset. Missing keys raise FileNotFoundError on every backend.
+
+    Classes:
+        S3Storage: Objects in an S3 bucket.
+        LocalStorage: Objects as files below a local directory.
+        MemoryStorage: Objects in an in-process dictionary.
+
+    Functions:
+        get_storage() Get the cached backend for a bucket setting.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Dict, Union
+
+import boto3
+from botocore.exceptions import ClientError
+
+
+Storage = Union["S3Storage", "LocalStorage", "MemoryStorage"]
+
+
+class S3Storage:
+    """Objects in an S3 bucket, sharing one client.
+
+    Args:
+        bucket_name (str): The S3 bucket.
+    """
+
+    def __init__(self, bucket_name: str) -> None:
+        self.bucket_name = bucket_name
+        self.client = boto3.client("s3")
+
+    def _not_found(self, e: ClientError, key: str) -> Exception:
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+            return FileNotFoundError(f"s3://{self.bucket_name}/{key}")
+        return e
+
+    def _head(self, key: str) -> dict:
+        try:
+            return self.client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            raise self._not_found(e, key) from e
+
+    def _get_object(self, key: str, **kwargs) -> dict:
+        try:
+            return self.client.get_object(Bucket=self.bucket_name, Key=key, **kwargs)
+        except ClientError as e:
+            raise self._not_found(e, key) from e
+
+    def get(self, key: str) -> bytes:
+        """Return the contents of an object."""
+        return self.open(key).read()
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Return the bytes `start` to `end` (exclusive) of an object."""
+        if end <= start:
+            return b""
+        return self._get_object(key, Range=f"bytes={start}-{end - 1}")["Body"].read()
+
+    def open(self, key: str, start: int = 0) -> BinaryIO:
+        """Return a stream over an object from byte `start`, without reading it all first."""
+        kwargs = {"Range": f"bytes={start}-"} if start else {}
+        return self._get_object(key, **kwargs)["Body"]
+
+    def put(self, key: str, body: bytes) -> None:
+        """Write an object in a single request."""
+        self.client.put_object(Bucket=self.bucket_name, Key=key, Body=body)
+
+    def upload(self, key: str, fileobj: BinaryIO) -> None:
+        """Write an object from a file, in concurrent multipart chunks when it is large."""
+        self.client.upload_fileobj(fileobj, self.bucket_name, key)
+
+    def etag(self, key: str) -> str:
+        """Return the object's ETag without downloading it."""
+        return self._head(key)["ETag"].strip('"')
+
+    def size(self, key: str) -> int:
+        """Return the object's size in bytes without downloading it."""
+        return self._head(key)["ContentLength"]
+
+    def uri(self, key: str) -> str:
+        """Return a printable location of an object."""
+        return f"s3://{self.bucket_name}/{key}"
+
+
+class LocalStorage:
+    """Objects as files below a local directory.
+
+    Reads are memory-mapped, so parsing a large file streams it from the page
+    cache. Writes go to a temporary file that is renamed into place, so readers
+    never see a partial object, as with S3.
+
+    Args:
+        root (str): The directory standing in for the bucket.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def get(self, key: str) -> bytes:
+        """Return the contents of an object."""
+        return self._path(key).read_bytes()
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Return the bytes `start` to `end` (exclusive) of an object."""
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return f.read(max(end - start, 0))
+
+    def open(self, key: str, start: int = 0) -> BinaryIO:
+        """Return a read-only memory map over an object, positioned at byte `start`."""
+        with open(self._path(key), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return io.BytesIO()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mapped.seek(start)
+        return mapped
+
+    def _write(self, key: str, write) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def put(self, key: str, body: bytes) -> None:
+        """Write an object."""
+        self._write(key, lambda f: f.write(body))
+
+    def upload(self, key: str, fileobj: BinaryIO) -> None:
+        """Write an object from a file, copying it in chunks."""
+        self._write(key, lambda f: shutil.copyfileobj(fileobj, f))
+
+    def etag(self, key: str) -> str:
+        """Return a version tag that changes whenever the file is rewritten."""
+        stat = self._path(key).stat()
+        return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+    def size(self, key: str) -> int:
+        """Return the file's size in bytes."""
+        return self._path(key).stat().st_size
+
+    def uri(self, key: str) -> str:
+        """Return a printable location of an object."""
+        return self._path(key).resolve().as_uri()
+
+
+class MemoryStorage:
+    """Objects in an in-process dictionary, for benchmarks and tests.
+
+    Args:
+        name (str): The name standing in for the bucket.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.objects: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes:
+        """Return the contents of an object."""
+        try:
+            return self.objects[key]
+        except KeyError:
+            raise FileNotFoundError(self.uri(key)) from None
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Return the bytes `start` to `end` (exclusive) of an object."""
+        return self.get(key)[start:end]
+
+    def open(self, key: str, start: int = 0) -> BinaryIO:
+        """Return a stream over an object from byte `start`."""
+        stream = io.BytesIO(self.get(key))
+        stream.seek(start)
+        return stream
+
+    def put(self, key: str, body: bytes) -> None:
+        """Write an object."""
+        self.objects[key] = bytes(body)
+
+    def upload(self, key: str, fileobj: BinaryIO) -> None:
+        """Write an object from a file."""
+        self.put(key, fileobj.read())
+
+    def etag(self, key: str) -> str:
+        """Return the MD5 of the object, like the ETag of a single-part S3 upload."""
+        return hashlib.md5(self.get(key)).hexdigest()
+
+    def size(self, key: str) -> int:
+        """Return the object's size in bytes."""
+        return len(self.get(key))
+
+    def uri(self, key: str) -> str:
+        """Return a printable location of an object."""
+        return f"memory://{self.name}/{key}"
+
+
+@lru_cache(maxsize=None)
+def get_storage(bucket_name: str) -> Storage:
+    """
+    Return the backend for a bucket setting, creating it on first use.
+
+    Backends are cached, so S3 clients are created once per process and the
+    in-memory backend keeps its objects between calls.
+
+    Args:
+        bucket_name (str): An S3 bucket name, `s3://name`, `file://path` or `memory://name`.
+
+    Returns:
+        Storage: The backend.
+    """
+    if bucket_name.startswith("file://"):
+        return LocalStorage(bucket_name.removeprefix("file://"))
+    if bucket_name.startswith("memory://"):
+        return MemoryStorage(bucket_name.removeprefix("memory://"))
+    return S3Storage(bucket_name.removeprefix("s3://"))
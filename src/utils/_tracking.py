@@ -0,0 +1,181 @@
+"""Asynchronous Batched MLflow Logging
+
+    Buffers params, metrics and tags in memory and sends them to the tracking
+    server in `log_batch` calls from a background thread, so that training does
+    not wait on tracking-server round trips.
+
+    Classes:
+        AsyncMlflowLogger: Background, batching logger bound to one MLflow run.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+
+# Limits of a single MLflow `log_batch` request
+MAX_ENTITIES_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+
+# Number of queued values that wakes the background thread before the interval
+FLUSH_THRESHOLD = 100
+
+
+class AsyncMlflowLogger:
+    """Buffer MLflow params, metrics and tags and flush them in batches.
+
+    Logged values are queued and sent by a background thread every
+    `flush_interval` seconds, or as soon as a full batch is waiting. Other
+    tracking calls can be queued with `submit` and run on the same thread in
+    logging order. `close` (or leaving the `with` block) flushes everything
+    and re-raises the first error raised by the background thread.
+
+    Args:
+        run_id (str): The MLflow run to log to.
+        flush_interval (float): Maximum seconds a value waits in the buffer.
+        client (Optional[MlflowClient]): Client used for the tracking calls.
+    """
+
+    def __init__(
+        self, run_id: str, flush_interval: float = 1.0, client: Optional[MlflowClient] = None
+    ) -> None:
+        self.run_id = run_id
+        self.flush_interval = flush_interval
+        self.client = client or MlflowClient()
+
+        self._queue: List[Tuple[str, Any]] = []
+        self._pending = 0
+        self._closed = False
+        self._errors: List[BaseException] = []
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="mlflow-logger", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> "AsyncMlflowLogger":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(raise_errors=exc_type is None)
+
+    def _put(self, kind: str, item: Any) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AsyncMlflowLogger is closed")
+            self._queue.append((kind, item))
+            self._pending += 1
+            if len(self._queue) >= FLUSH_THRESHOLD or kind == "call":
+                self._cond.notify_all()
+
+    def log_param(self, key: str, value: Any) -> None:
+        """Queue a single run parameter."""
+        self._put("param", Param(key, str(value)))
+
+    def log_params(self, params: Dict[str, Any]) -> None:
+        """Queue several run parameters."""
+        for key, value in params.items():
+            self.log_param(key, value)
+
+    def log_metric(self, key: str, value: float, step: int = 0) -> None:
+        """Queue a single metric value, timestamped now."""
+        self._put("metric", Metric(key, float(value), int(time.time() * 1000), step))
+
+    def log_metrics(self, metrics: Dict[str, float], step: int = 0) -> None:
+        """Queue several metric values, timestamped now."""
+        for key, value in metrics.items():
+            self.log_metric(key, value, step)
+
+    def set_tag(self, key: str, value: Any) -> None:
+        """Queue a single run tag."""
+        self._put("tag", RunTag(key, str(value)))
+
+    def set_tags(self, tags: Dict[str, Any]) -> None:
+        """Queue several run tags."""
+        for key, value in tags.items():
+            self.set_tag(key, value)
+
+    def log_dict(self, dictionary: Dict[str, Any], artifact_file: str) -> None:
+        """Queue a JSON/YAML artifact upload for the run."""
+        self.submit(self.client.log_dict, self.run_id, dictionary, artifact_file)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Queue any tracking call to run on the background thread in logging order."""
+        self._put("call", (fn, args, kwargs))
+
+    def flush(self, raise_errors: bool = True) -> None:
+        """Block until everything queued so far has been sent."""
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending and self._worker.is_alive():
+                self._cond.wait()
+        if raise_errors:
+            self._raise_errors()
+
+    def close(self, raise_errors: bool = True) -> None:
+        """Flush, stop the background thread and surface any logging error."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+        if raise_errors:
+            self._raise_errors()
+
+    def _raise_errors(self) -> None:
+        if self._errors:
+            error, self._errors = self._errors[0], []
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                items, self._queue = self._queue, []
+                closed = self._closed
+
+            self._send(items)
+
+            with self._cond:
+                self._pending -= len(items)
+                self._cond.notify_all()
+                if closed and not self._queue:
+                    return
+
+    def _send(self, items: List[Tuple[str, Any]]) -> None:
+        batch: Dict[str, List[Any]] = {"metric": [], "param": [], "tag": []}
+        for kind, item in items:
+            if kind == "call":
+                # Keep ordering: everything logged before the call is sent first
+                self._log_batch(batch)
+                fn, args, kwargs = item
+                self._guard(fn, *args, **kwargs)
+            else:
+                batch[kind].append(item)
+        self._log_batch(batch)
+
+    def _log_batch(self, batch: Dict[str, List[Any]]) -> None:
+        metrics, params, tags = batch["metric"], batch["param"], batch["tag"]
+        while metrics or params or tags:
+            batch_params = params[:MAX_PARAMS_PER_BATCH]
+            batch_tags = tags[:MAX_TAGS_PER_BATCH]
+            n_metrics = MAX_ENTITIES_PER_BATCH - len(batch_params) - len(batch_tags)
+            self._guard(
+                self.client.log_batch,
+                self.run_id,
+                metrics=metrics[:n_metrics],
+                params=batch_params,
+                tags=batch_tags,
+            )
+            del metrics[:n_metrics]
+            del params[: len(batch_params)]
+            del tags[: len(batch_tags)]
+
+    def _guard(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"MLflow logging failed: {e}")
+            self._errors.append(e)
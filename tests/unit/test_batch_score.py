@@ -0,0 +1,95 @@
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from pipelines.batch_score import batch_score, resolve_shadow_version, shadow_score
+from pipelines.pre_process import FEATURE_COLUMNS
+from pipelines.window_features import WINDOW_FEATURE_COLUMNS
+
+
+class ConstantModel:
+    """Model stub returning wind speed scaled by a constant."""
+
+    def __init__(self, factor):
+        self.factor = factor
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return X["Wind Speed (m/s)"].to_numpy() * self.factor
+
+
+class ColumnCountModel:
+    """Model stub predicting the number of input columns it was given."""
+
+    def predict(self, X):
+        return [X.shape[1]] * len(X)
+
+
+def _prepared_df():
+    return pd.DataFrame(
+        {
+            "Wind Speed (m/s)": [1.0, 2.0, 3.0],
+            "Theoretical_Power_Curve (KWh)": [10.0, 20.0, 30.0],
+            "Wind Direction (°)": [90.0, 180.0, 270.0],
+            "Month": [3, 4, 5],
+            "Hour": [0, 1, 2],
+        }
+    )
+
+
+def test_batch_score_adds_score_column():
+    # Test case where the whole frame is scored with a single predict call
+    model = ConstantModel(2.0)
+
+    scored = batch_score(_prepared_df(), model)
+
+    assert scored["score"].tolist() == [2.0, 4.0, 6.0]
+    assert model.calls == 1
+
+
+def test_shadow_score_emits_both_predictions_and_divergence():
+    # Test case where champion and challenger share one feature matrix
+    champion, challenger = ConstantModel(2.0), ConstantModel(3.0)
+
+    scored, divergence = shadow_score(_prepared_df(), champion, challenger)
+
+    assert scored["score"].tolist() == [2.0, 4.0, 6.0]
+    assert scored["challenger_score"].tolist() == [3.0, 6.0, 9.0]
+    assert scored["score_diff"].tolist() == [1.0, 2.0, 3.0]
+    assert divergence["shadow_max_abs_diff"] == 3.0
+    assert divergence["shadow_mean_diff"] == 2.0
+    assert divergence["shadow_rmse_diff"] == pytest.approx((14 / 3) ** 0.5)
+    assert champion.calls == challenger.calls == 1
+
+
+def test_shadow_score_uses_each_models_feature_set():
+    # Test case where the shadow model takes the window features and the champion does not
+    df = _prepared_df()
+    for col in WINDOW_FEATURE_COLUMNS:
+        df[col] = 0.0
+    champion, challenger = ColumnCountModel(), ColumnCountModel()
+
+    scored, _ = shadow_score(df, champion, challenger, challenger_window_features=True)
+
+    n_window = len(FEATURE_COLUMNS + WINDOW_FEATURE_COLUMNS)
+    assert scored["score"].tolist() == [len(FEATURE_COLUMNS)] * 3
+    assert scored["challenger_score"].tolist() == [n_window] * 3
+
+
+def test_resolve_shadow_version_missing_alias():
+    # Test case where the shadow alias is not set, so only the champion is scored
+    registry = MagicMock(model_name="model")
+    registry.version_by_alias.return_value = None
+
+    assert resolve_shadow_version(registry, "challenger") is None
+
+
+def test_resolve_shadow_version_by_alias():
+    # Test case where the shadow alias resolves to a version
+    registry = MagicMock(model_name="model")
+    registry.version_by_alias.return_value = "3"
+
+    assert resolve_shadow_version(registry, "archived") == "3"
+    registry.version_by_alias.assert_called_once_with("archived")
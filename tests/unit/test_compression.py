@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor
+
+from pipelines.compression import (
+    compression_curve,
+    rebuild_forest,
+    select_forest,
+    truncate_forest,
+)
+
+
+class RecordingTracker:
+    """AsyncMlflowLogger stub keeping logged values in memory."""
+
+    def __init__(self):
+        self.metrics = []
+        self.params = {}
+
+    def log_metrics(self, metrics, step=0):
+        self.metrics.extend((key, value, step) for key, value in metrics.items())
+
+    def log_params(self, params):
+        self.params.update(params)
+
+
+@pytest.fixture(name="data")
+def fixture_data():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 25, size=(600, 5))
+    y = 100 * X[:, 0] + rng.normal(0, 5, 600)
+    model = ExtraTreesRegressor(n_estimators=40, random_state=0).fit(X[:400], y[:400])
+    return model, X[:400], X[400:], y[400:]
+
+
+def test_truncate_forest_matches_cumulative_curve(data):
+    # Test case where the curve RMSE equals the RMSE of the truncated model
+    model, X_train, X_test, y_test = data
+    curve = compression_curve(model, X_train, X_test, y_test, sizes=[5, 20])
+
+    assert [p["n_trees"] for p in curve] == [5, 20, 40]
+    truncated = truncate_forest(model, 5)
+    rmse = np.sqrt(np.mean((truncated.predict(X_test) - y_test) ** 2))
+    assert curve[0]["rmse"] == pytest.approx(rmse)
+    assert curve[0]["size_bytes"] < curve[-1]["size_bytes"]
+    assert len(model.estimators_) == 40
+
+
+def test_select_forest_picks_smallest_within_tolerance(data):
+    # Test case where a generous tolerance and budget allow the smallest forest
+    model, X_train, X_test, y_test = data
+    tracker = RecordingTracker()
+
+    selected, point = select_forest(
+        model, X_train, X_test, y_test, [5, 20], 10.0, float("inf"), tracker
+    )
+
+    assert point["n_trees"] == 5
+    assert len(selected.estimators_) == 5
+    assert tracker.params == {"selected_variant": "truncated", "selected_n_trees": 5}
+    steps = {step for key, _, step in tracker.metrics if key == "compression_truncated_rmse"}
+    assert steps == {5, 20, 40}
+
+
+def test_select_forest_keeps_full_model_when_nothing_qualifies(data):
+    # Test case where no candidate meets an impossible latency budget
+    model, X_train, X_test, y_test = data
+
+    selected, point = select_forest(
+        model, X_train, X_test, y_test, [5, 20], 0.0, 0.0, RecordingTracker()
+    )
+
+    assert selected is model
+    assert point["n_trees"] == 40
+
+
+def test_rebuild_forest_matches_smaller_forest_fitted_on_all_rows(data):
+    # Test case where the selected tree count is taken from the forest fitted on all rows
+    model, X_train, _, _ = data
+    y_train = model.predict(X_train)
+    full = ExtraTreesRegressor(n_estimators=40, random_state=0).fit(X_train, y_train)
+
+    rebuilt = rebuild_forest(full, {"variant": "truncated", "n_trees": 5}, X_train)
+    small = ExtraTreesRegressor(n_estimators=5, random_state=0).fit(X_train, y_train)
+
+    np.testing.assert_allclose(rebuilt.predict(X_train[:50]), small.predict(X_train[:50]))
+    assert rebuild_forest(full, {"variant": "truncated", "n_trees": 40}, X_train) is full
@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from pipelines.data_pull import load_new_data
+from utils._storage import get_storage
+
+
+HEADER = "Date/Time,Wind Speed (m/s)\n"
+
+
+def _rows(minutes):
+    return "".join(f"01 03 2018 00:{m:02d},{m / 10}\n" for m in minutes)
+
+
+def test_load_new_data_reads_only_appended_bytes():
+    # Test case where a second run resumes at the byte offset of the first one
+    storage = get_storage("memory://incremental")
+    storage.put("data/test.csv", (HEADER + _rows([0, 10])).encode())
+    df, position = load_new_data("test.csv", "memory://incremental", None)
+    assert len(df) == 2 and position["offset"] == storage.size("data/test.csv")
+
+    storage.put("data/test.csv", (HEADER + _rows([0, 10, 20, 30])).encode())
+    with patch.object(storage, "open", wraps=storage.open) as spy:
+        df, position = load_new_data(
+            "test.csv", "memory://incremental", df["Date/Time"].max(), position=position
+        )
+
+    spy.assert_called_once_with("data/test.csv", len(HEADER + _rows([0, 10])))
+    assert df["Wind Speed (m/s)"].tolist() == [2.0, 3.0]
+
+
+def test_load_new_data_without_new_bytes():
+    # Test case where nothing was appended, so nothing is downloaded
+    storage = get_storage("memory://unchanged")
+    storage.put("data/test.csv", (HEADER + _rows([0])).encode())
+    _, position = load_new_data("test.csv", "memory://unchanged", None)
+
+    with patch.object(storage, "open") as spy:
+        df, same_position = load_new_data("test.csv", "memory://unchanged", None, position=position)
+
+    spy.assert_not_called()
+    assert df.empty and same_position == position
+
+
+def test_load_new_data_rescans_rewritten_file():
+    # Test case where a rewritten file is read from the start again
+    storage = get_storage("memory://rewritten")
+    storage.put("data/test.csv", (HEADER + _rows([0, 10])).encode())
+    _, position = load_new_data("test.csv", "memory://rewritten", None)
+
+    storage.put("data/test.csv", (HEADER + _rows([1, 11, 21])).encode())
+    df, _ = load_new_data("test.csv", "memory://rewritten", None, position=position)
+
+    assert len(df) == 3
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.drift import DriftSketch, QuantileSketch, build_sketch, drift_statistics
+from pipelines.pre_process import FEATURE_COLUMNS
+
+
+def _features(rng, n, wind_shift=0.0):
+    return pd.DataFrame(
+        {
+            "Wind Speed (m/s)": rng.uniform(0, 20, n) + wind_shift,
+            "Theoretical_Power_Curve (KWh)": rng.uniform(0, 3600, n),
+            "Wind Direction (°)": rng.uniform(0, 360, n),
+            "Month": rng.integers(2, 12, n),
+            "Hour": rng.integers(0, 24, n),
+        }
+    )[FEATURE_COLUMNS]
+
+
+def test_quantile_sketch_is_bounded_and_accurate():
+    # Test case where many values are summarised by a fixed number of centroids
+    values = np.random.default_rng(0).normal(size=50_000)
+    sketch = QuantileSketch(capacity=100)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+
+    assert len(sketch.means) <= 100
+    assert sketch.quantile(0.5) == pytest.approx(np.quantile(values, 0.5), abs=0.05)
+    assert sketch.quantile(0.9) == pytest.approx(np.quantile(values, 0.9), abs=0.05)
+
+
+def test_sketch_merge_matches_single_pass():
+    # Test case where sketches built on two halves merge into the full-data sketch
+    df = _features(np.random.default_rng(1), 2_000)
+    predictions = df["Wind Speed (m/s)"].to_numpy() * 100
+
+    full = build_sketch(df, predictions, chunksize=300)
+    merged = build_sketch(df.iloc[:1_000], predictions[:1_000])
+    merged.merge(build_sketch(df.iloc[1_000:], predictions[1_000:]))
+
+    assert merged.rows == full.rows == 2_000
+    for col in full.histograms:
+        assert (merged.histograms[col].counts == full.histograms[col].counts).all()
+
+
+def test_drift_statistics_flag_shifted_feature():
+    # Test case where only wind speed has shifted between training and scoring
+    rng = np.random.default_rng(2)
+    reference = build_sketch(_features(rng, 5_000))
+    current = DriftSketch.from_dict(build_sketch(_features(rng, 5_000, wind_shift=5.0)).to_dict())
+
+    stats = drift_statistics(reference, current)
+
+    assert stats["drift_psi_wind_speed"] > 0.2
+    assert stats["drift_psi_wind_direction"] < 0.05
+    assert "drift_psi_prediction" not in stats
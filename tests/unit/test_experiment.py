@@ -0,0 +1,105 @@
+from configparser import ConfigParser
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from pipelines.experiment import (
+    evaluate_and_update_champion,
+    mlflow_initial_tags_aliases,
+    model_outlier_bounds,
+    prepare_evaluation_data,
+)
+from pipelines.pre_process import FEATURE_COLUMNS
+from pipelines.window_features import WINDOW_FEATURE_COLUMNS
+
+
+def _config(policy):
+    config = ConfigParser()
+    config.read_string(
+        f"""
+        [Files]
+        training_data = turbine_data.csv
+        [FeatureStore]
+        enabled = false
+        path = .feature_store
+        [Validation]
+        policy = {policy}
+        """
+    )
+    return config
+
+
+def _raw(n=40):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "Date/Time": pd.date_range("2018-03-01", periods=n, freq="10min").strftime(
+                "%d %m %Y %H:%M"
+            ),
+            "LV ActivePower (kW)": rng.uniform(0, 3000, n),
+            "Wind Speed (m/s)": rng.uniform(0, 20, n),
+            "Theoretical_Power_Curve (KWh)": rng.uniform(0, 3000, n),
+            "Wind Direction (°)": rng.uniform(0, 360, n),
+        }
+    )
+    df.loc[3, "Date/Time"] = "not a date"
+    return df
+
+
+@patch("pipelines.feature_store.load_data")
+def test_prepare_evaluation_data_validates_training_data(mock_load):
+    # Test case where the evaluation holdout drops invalid rows as in training
+    mock_load.return_value = _raw()
+
+    X_test, y_test = prepare_evaluation_data(_config("drop"), window_features=True)
+
+    assert len(X_test) == len(y_test) > 0
+    assert list(X_test.columns) == FEATURE_COLUMNS + WINDOW_FEATURE_COLUMNS
+
+
+class WidthCheckingModel:
+    """Model stub predicting the target only from the number of columns it was trained on."""
+
+    def __init__(self, n_columns, error):
+        self.n_columns = n_columns
+        self.error = error
+
+    def predict(self, X):
+        assert X.shape[1] == self.n_columns
+        return np.full(len(X), 10.0 + self.error)
+
+
+@patch("pipelines.experiment.load_model_by_version")
+def test_evaluate_and_update_champion_with_different_feature_sets(mock_load):
+    # Test case where a window-feature challenger is compared with a base-feature champion
+    n_window = len(FEATURE_COLUMNS + WINDOW_FEATURE_COLUMNS)
+    models = {"2": WidthCheckingModel(n_window, 1.0), "1": WidthCheckingModel(5, 3.0)}
+    mock_load.side_effect = lambda name, version: models[version]
+    registry = MagicMock(model_name="model")
+    registry.version_by_alias.side_effect = {"challenger": "2", "champion": "1"}.get
+    registry.version_tags.side_effect = lambda version: (
+        {"window_features": "true"} if version == "2" else {}
+    )
+    data = pd.DataFrame(np.zeros((4, n_window)), columns=FEATURE_COLUMNS + WINDOW_FEATURE_COLUMNS)
+
+    evaluate_and_update_champion(registry, data, np.full(4, 10.0))
+
+    registry.set_alias.assert_any_call("champion", "2")
+    registry.set_alias.assert_any_call("archived", "1")
+
+
+@patch("pipelines.experiment.RegistryClient")
+def test_new_version_tags_round_trip(mock_registry):
+    # Test case where the feature set and outlier bounds recorded at registration are read back
+    registry = mock_registry.return_value
+    registry.latest_version.return_value = MagicMock(version="4")
+    tags = {}
+    registry.set_version_tag.side_effect = lambda version, key, value: tags.update({key: value})
+    registry.version_tags.return_value = tags
+
+    mlflow_initial_tags_aliases("model", window_features=True, outlier_bounds=(-1.25, 20.75))
+
+    assert tags["window_features"] == "true"
+    assert model_outlier_bounds(registry, "4") == (-1.25, 20.75)
+    registry.set_alias.assert_called_once_with("candidate", "4")
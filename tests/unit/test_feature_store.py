@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.feature_store import FeatureStore, load_features
+from pipelines.validation import DataValidator
+
+
+def _prepared_df():
+    return pd.DataFrame(
+        {
+            "LV ActivePower (kW)": [100.0, 200.0, 300.0],
+            "Wind Speed (m/s)": [5.0, 6.0, 7.0],
+            "Month": np.array([3, 4, 5], dtype=np.int32),
+        },
+        index=[2, 5, 9],
+    )
+
+
+def test_feature_store_round_trip_is_memory_mapped(tmp_path):
+    # Test case where a written entry is read back without copying the data
+    store = FeatureStore(str(tmp_path))
+    key = store.key("turbine_data.csv", "abc123", "train")
+
+    prepared = _prepared_df()
+    prepared.attrs["wind_speed_bounds"] = (0.5, 20.5)
+    store.write(key, prepared)
+    df = store.read(key)
+
+    pd.testing.assert_frame_equal(df, prepared, check_index_type=False)
+    assert df.attrs == {"wind_speed_bounds": (0.5, 20.5)}
+    # A copy would be writeable; the read-only views are backed by the memory maps
+    assert not any(df[col].to_numpy().flags.writeable for col in df.columns)
+
+
+def test_feature_store_rejects_non_numeric_columns(tmp_path):
+    # Test case where a text column is refused instead of being dropped silently
+    store = FeatureStore(str(tmp_path))
+    df = _prepared_df().assign(Site="A")
+
+    with pytest.raises(ValueError, match="Site"):
+        store.write(store.key("turbine_data.csv", "abc123", "train"), df)
+
+
+def test_feature_store_builds_each_entry_once(tmp_path):
+    # Test case where the build function only runs when the entry is missing
+    store = FeatureStore(str(tmp_path))
+    key = store.key("turbine_data.csv", "abc123", "train")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return _prepared_df()
+
+    store.get_or_build(key, build)
+    store.get_or_build(key, build)
+
+    assert len(builds) == 1
+
+
+def test_feature_store_key_changes_with_etag_and_mode():
+    # Test case where a new source version or mode never reuses an old entry
+    keys = {
+        FeatureStore.key("turbine_data.csv", "abc123", "train"),
+        FeatureStore.key("turbine_data.csv", "def456", "train"),
+        FeatureStore.key("turbine_data.csv", "abc123", "score"),
+        FeatureStore.key("turbine_data.csv", "abc123", "score", outlier_bounds=(0.0, 20.0)),
+        FeatureStore.key("turbine_data.csv", "abc123", "score", outlier_bounds=(0.0, 20.5)),
+    }
+
+    assert len(keys) == 5
+
+
+def _raw():
+    return pd.DataFrame(
+        {
+            "Date/Time": ["01 03 2018 00:00", "01 03 2018 00:10", "bad date"],
+            "LV ActivePower (kW)": [100.0, 200.0, 300.0],
+            "Wind Speed (m/s)": [5.0, 6.0, 7.0],
+            "Theoretical_Power_Curve (KWh)": [150.0, 250.0, 350.0],
+            "Wind Direction (°)": [10.0, 20.0, 30.0],
+        }
+    )
+
+
+@patch("pipelines.feature_store.get_data_etag", return_value="abc123")
+@patch("pipelines.feature_store.load_data")
+def test_load_features_restores_validation_report_on_hit(mock_load, _, tmp_path):
+    # Test case where a cached entry reports the data quality metrics of its build
+    mock_load.side_effect = lambda *args: _raw()
+
+    built = DataValidator(mode="train", policy="drop")
+    load_features("turbine_data.csv", "bucket", "train", str(tmp_path), validate=built)
+    cached = DataValidator(mode="train", policy="drop")
+    load_features("turbine_data.csv", "bucket", "train", str(tmp_path), validate=cached)
+
+    assert mock_load.call_count == 1
+    assert cached.metrics() == built.metrics()
+    assert cached.metrics()["dq_invalid_rows"] == 1.0
+
+
+def test_feature_store_key_changes_with_validation():
+    # Test case where another validation policy or rules version never reuses an entry
+    keys = {
+        FeatureStore.key("turbine_data.csv", "abc123", "train"),
+        FeatureStore.key("turbine_data.csv", "abc123", "train", validation="drop-r1"),
+        FeatureStore.key("turbine_data.csv", "abc123", "train", validation="fail-r1"),
+        FeatureStore.key("turbine_data.csv", "abc123", "train", validation="drop-r2"),
+    }
+
+    assert len(keys) == 4
@@ -1,7 +1,8 @@
+import numpy as np
 import pandas as pd
 import pytest
 
-from pipelines.pre_process import validate_columns
+from pipelines.pre_process import OUTLIER_BOUNDS_ATTR, prepare_data, validate_columns
 
 
 def test_validate_columns_all_present():
@@ -30,3 +31,42 @@ def test_validate_columns_extra_columns():
 
     # This should not raise any exception because required columns are present.
     validate_columns(df, required_columns)
+
+
+def _scoring_rows(n=40):
+    rng = np.random.default_rng(0)
+    wind_speed = rng.uniform(0, 10, n)
+    wind_speed[[5, 30]] = [40.0, 39.0]
+    return pd.DataFrame(
+        {
+            "Date/Time": pd.date_range("2018-03-01", periods=n, freq="10min").strftime(
+                "%d %m %Y %H:%M"
+            ),
+            "Wind Speed (m/s)": wind_speed,
+            "Theoretical_Power_Curve (KWh)": rng.uniform(0, 3000, n),
+            "Wind Direction (°)": rng.uniform(0, 360, n),
+        }
+    )
+
+
+def test_prepare_data_fixed_outlier_bounds_do_not_depend_on_batches():
+    # Test case where fixed bounds keep the same rows whether the data is prepared whole or split
+    bounds = (0.0, 25.0)
+    whole = prepare_data(_scoring_rows(), mode="score", outlier_bounds=bounds)
+    parts = pd.concat(
+        [
+            prepare_data(_scoring_rows().iloc[:10], mode="score", outlier_bounds=bounds),
+            prepare_data(_scoring_rows().iloc[10:], mode="score", outlier_bounds=bounds),
+        ]
+    )
+
+    pd.testing.assert_frame_equal(parts, whole)
+    assert len(whole) == 38 and whole.attrs[OUTLIER_BOUNDS_ATTR] == bounds
+
+
+def test_prepare_data_records_computed_outlier_bounds():
+    # Test case where the IQR bounds computed from the data are kept for the model
+    prepared = prepare_data(_scoring_rows(), mode="score")
+    low, high = prepared.attrs[OUTLIER_BOUNDS_ATTR]
+
+    assert low < prepared["Wind Speed (m/s)"].min() and high < 39.0
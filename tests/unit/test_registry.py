@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from utils._registry import RegistryClient
+
+
+class FakeRegistry:
+    """MlflowClient stub holding versions and aliases and counting round trips."""
+
+    def __init__(self, n_versions, aliases=None):
+        self.versions = [SimpleNamespace(version=str(v)) for v in range(1, n_versions + 1)]
+        self.model_aliases = dict(aliases or {})
+        self.tags = {}
+        self.calls = []
+
+    def search_model_versions(self, filter_string, max_results, order_by):
+        self.calls.append("search")
+        assert order_by == ["version_number DESC"]
+        ordered = sorted(self.versions, key=lambda v: int(v.version), reverse=True)
+        return ordered[:max_results]
+
+    def get_registered_model(self, name):
+        self.calls.append("get")
+        return SimpleNamespace(aliases=dict(self.model_aliases))
+
+    def set_registered_model_alias(self, name, alias, version):
+        self.calls.append("set")
+        self.model_aliases[alias] = version
+
+    def get_model_version(self, name, version):
+        self.calls.append("get_version")
+        return SimpleNamespace(tags=dict(self.tags.get(version, {})))
+
+    def set_model_version_tag(self, name, version, key, value):
+        self.calls.append("tag")
+        self.tags.setdefault(version, {})[key] = value
+
+    def delete_registered_model_alias(self, name, alias):
+        self.calls.append("delete")
+        del self.model_aliases[alias]
+
+
+def test_latest_version_fetches_a_single_ordered_page():
+    # Test case where the latest of many versions is found with one request
+    client = FakeRegistry(n_versions=500)
+    registry = RegistryClient("model", client)
+
+    assert registry.latest_version().version == "500"
+    assert registry.has_multiple_versions()
+    assert client.calls == ["search", "search"]
+
+
+def test_alias_lookups_are_memoized():
+    # Test case where repeated alias lookups reuse a single registry read
+    client = FakeRegistry(n_versions=3, aliases={"champion": "1", "challenger": "3"})
+    registry = RegistryClient("model", client)
+
+    for _ in range(5):
+        assert registry.version_by_alias("champion") == "1"
+        assert registry.version_by_alias("challenger") == "3"
+    assert registry.version_by_alias("candidate") is None
+    assert client.calls == ["get"]
+
+
+def test_commit_sends_only_net_alias_changes():
+    # Test case mirroring a promotion: candidate -> challenger -> champion
+    client = FakeRegistry(n_versions=3, aliases={"champion": "1", "candidate": "3"})
+    registry = RegistryClient("model", client)
+
+    registry.set_alias("challenger", registry.version_by_alias("candidate"))
+    registry.delete_alias("candidate")
+    registry.set_alias("champion", registry.version_by_alias("challenger"))
+    registry.set_alias("archived", "1")
+    registry.delete_alias("challenger")
+    registry.commit()
+
+    assert client.model_aliases == {"champion": "3", "archived": "1"}
+    assert client.calls.count("get") == 1
+    assert "set" in client.calls and len(client.calls) == 4
+
+
+def test_version_tags_are_memoized_until_changed():
+    # Test case where version tags are read once and re-read after a tag is set
+    client = FakeRegistry(n_versions=2)
+    registry = RegistryClient("model", client)
+
+    assert registry.version_tags("2") == {}
+    registry.set_version_tag("2", "window_features", "true")
+    for _ in range(3):
+        assert registry.version_tags("2") == {"window_features": "true"}
+    assert client.calls == ["get_version", "tag", "get_version"]
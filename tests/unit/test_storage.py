@@ -0,0 +1,67 @@
+import io
+import mmap
+
+import pandas as pd
+import pytest
+
+from pipelines.data_pull import get_data_etag, load_data
+from pipelines.post_process import publish_data
+from utils._storage import LocalStorage, MemoryStorage, S3Storage, get_storage
+
+
+def test_get_storage_selects_backend(tmp_path):
+    # Test case where the bucket setting picks the backend and backends are reused
+    assert isinstance(get_storage(f"file://{tmp_path}"), LocalStorage)
+    assert isinstance(get_storage("memory://select"), MemoryStorage)
+    assert get_storage("memory://select") is get_storage("memory://select")
+
+
+def test_get_storage_plain_bucket_name_is_s3():
+    # Test case where a plain bucket name keeps using S3
+    storage = get_storage("s3://some-bucket")
+
+    assert isinstance(storage, S3Storage)
+    assert storage.bucket_name == "some-bucket"
+
+
+@pytest.mark.parametrize("backend", ["local", "memory"])
+def test_storage_round_trip(tmp_path, backend):
+    # Test case where put, upload, get and etag behave the same on the offline backends
+    storage = LocalStorage(str(tmp_path)) if backend == "local" else MemoryStorage("bench")
+
+    storage.put("a/b.txt", b"hello")
+    etag = storage.etag("a/b.txt")
+    assert storage.get("a/b.txt") == b"hello"
+    assert storage.open("a/b.txt").read() == b"hello"
+    assert storage.open("a/b.txt", 2).read() == b"llo"
+    assert storage.get_range("a/b.txt", 1, 4) == b"ell"
+    assert storage.size("a/b.txt") == 5
+
+    storage.upload("a/b.txt", io.BytesIO(b"hello again"))
+    assert storage.get("a/b.txt") == b"hello again"
+    assert storage.etag("a/b.txt") != etag
+
+    with pytest.raises(FileNotFoundError):
+        storage.get("missing")
+
+
+def test_local_storage_reads_are_memory_mapped(tmp_path):
+    # Test case where local reads map the file instead of copying it
+    storage = LocalStorage(str(tmp_path))
+    storage.put("data.csv", b"a,b\n1,2\n")
+
+    assert isinstance(storage.open("data.csv"), mmap.mmap)
+
+
+def test_pipelines_run_on_memory_bucket():
+    # Test case where data pull and publishing work without S3
+    bucket = "memory://pipelines"
+    get_storage(bucket).put("data/test.csv", b"x,y\n1,2\n3,4\n")
+
+    df = load_data("test.csv", bucket)
+    publish_data(df, bucket, file_name="result")
+
+    assert df["y"].tolist() == [2, 4]
+    assert get_data_etag("test.csv", bucket)
+    published = pd.read_csv(get_storage(bucket).open("output_files/result.csv"))
+    pd.testing.assert_frame_equal(published, df)
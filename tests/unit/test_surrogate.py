@@ -0,0 +1,64 @@
+import numpy as np
+
+from pipelines.surrogate import (
+    LookupTableSurrogate,
+    build_surrogate,
+    surrogate_or_model,
+)
+
+
+class LinearModel:
+    """Model stub that is linear in every input, so interpolation is exact."""
+
+    coef = np.array([10.0, 0.5, 0.1, 3.0, 2.0])
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef
+
+
+def _features(rng, n):
+    return np.column_stack(
+        [
+            rng.uniform(0, 25, n),
+            rng.uniform(0, 3600, n),
+            rng.uniform(0, 360, n),
+            rng.integers(2, 12, n),
+            rng.integers(0, 24, n),
+        ]
+    ).astype(np.float64)
+
+
+def test_build_surrogate_reports_holdout_error():
+    # Test case where a linear model is reproduced by multilinear interpolation
+    rng = np.random.default_rng(0)
+    surrogate = build_surrogate(
+        LinearModel(), _features(rng, 500), _features(rng, 200), [5, 5, 5], 1.0, 1.0
+    )
+
+    assert surrogate.table.shape == (5, 5, 5, 10, 24)
+    assert surrogate.metadata["rmse"] < 1.0
+    assert surrogate.within_bound
+
+
+def test_surrogate_save_and_load(tmp_path):
+    # Test case where the table and its metadata survive a round trip to disk
+    rng = np.random.default_rng(1)
+    X = _features(rng, 100)
+    surrogate = build_surrogate(LinearModel(), X, X, [4, 4, 4], 0.0, 0.0)
+    path = tmp_path / "lookup_table.npz"
+
+    surrogate.save(path)
+    loaded = LookupTableSurrogate.load(path)
+
+    np.testing.assert_allclose(loaded.predict(X), surrogate.predict(X))
+    assert loaded.metadata == surrogate.metadata
+
+
+def test_surrogate_or_model_falls_back_outside_bound():
+    # Test case where a surrogate that missed its error bound is not used
+    surrogate = LookupTableSurrogate([], np.empty(0), {"within_bound": False})
+
+    assert surrogate_or_model(surrogate, lambda: "forest") == "forest"
+    assert surrogate_or_model(None, lambda: "forest") == "forest"
+    surrogate.metadata["within_bound"] = True
+    assert surrogate_or_model(surrogate, lambda: "forest") is surrogate
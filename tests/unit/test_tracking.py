@@ -0,0 +1,61 @@
+import pytest
+
+from utils._tracking import AsyncMlflowLogger
+
+
+class RecordingClient:
+    """MlflowClient stub recording the calls made by the logger."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        if self.fail:
+            raise ConnectionError("tracking server unavailable")
+        self.calls.append(("batch", len(metrics), len(params), len(tags)))
+
+
+def test_logger_batches_values_and_flushes_on_close():
+    # Test case where params, metrics and tags are sent together in one request
+    client = RecordingClient()
+    with AsyncMlflowLogger("run", flush_interval=60, client=client) as tracker:
+        tracker.log_params({"a": 1, "b": 2})
+        tracker.log_metrics({"rmse": 1.0, "r2": 0.9})
+        tracker.set_tag("stage", "train")
+
+    assert client.calls == [("batch", 2, 2, 1)]
+
+
+def test_logger_keeps_order_around_submitted_calls():
+    # Test case where a queued call runs after everything logged before it
+    client = RecordingClient()
+    with AsyncMlflowLogger("run", flush_interval=60, client=client) as tracker:
+        tracker.log_metric("before", 1.0)
+        tracker.submit(lambda: client.calls.append(("call",)))
+        tracker.log_metric("after", 2.0)
+
+    assert client.calls == [("batch", 1, 0, 0), ("call",), ("batch", 1, 0, 0)]
+
+
+def test_logger_splits_batches_at_request_limits():
+    # Test case where more values are logged than a single request may carry
+    client = RecordingClient()
+    tracker = AsyncMlflowLogger("run", flush_interval=60, client=client)
+    tracker.log_params({f"p{i}": i for i in range(150)})
+    tracker.log_metrics({f"m{i}": i for i in range(1000)})
+    tracker.close()
+
+    assert sum(call[1] for call in client.calls) == 1000
+    assert sum(call[2] for call in client.calls) == 150
+    assert all(call[1] + call[2] <= 1000 and call[2] <= 100 for call in client.calls)
+
+
+def test_logger_surfaces_errors_on_flush():
+    # Test case where a failing tracking server is reported to the caller
+    tracker = AsyncMlflowLogger("run", flush_interval=60, client=RecordingClient(fail=True))
+    tracker.log_metric("rmse", 1.0)
+
+    with pytest.raises(ConnectionError, match="tracking server unavailable"):
+        tracker.flush()
+    tracker.close()
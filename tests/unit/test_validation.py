@@ -0,0 +1,85 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.validation import DataValidator, validate_data
+
+
+def _raw():
+    return pd.DataFrame(
+        {
+            "Date/Time": ["01 03 2018 00:00", "01 03 2018 00:10", "bad date", "01 03 2018 00:30"],
+            "LV ActivePower (kW)": [100.0, 200.0, 300.0, 400.0],
+            "Wind Speed (m/s)": [5.0, -1.0, 6.0, np.nan],
+            "Theoretical_Power_Curve (KWh)": [150.0, 250.0, 350.0, 450.0],
+            "Wind Direction (°)": [10.0, 20.0, 30.0, 400.0],
+        }
+    )
+
+
+def test_validate_data_collects_statistics():
+    # Test case where one pass counts nulls, parse failures and range violations per column
+    valid, invalid, report = validate_data(_raw(), mode="train", policy="drop", chunksize=2)
+
+    assert len(valid) == 1 and len(invalid) == 3
+    assert report.rows == 4 and report.invalid_rows == 3
+    assert report.invalid_values["Date/Time"] == 1
+    assert report.out_of_range["Wind Speed (m/s)"] == 1
+    assert report.nulls["Wind Speed (m/s)"] == 1
+    assert report.out_of_range["Wind Direction (°)"] == 1
+    assert report.min["Wind Speed (m/s)"] == -1.0 and report.max["Wind Speed (m/s)"] == 6.0
+
+    metrics = report.to_metrics()
+    assert metrics["dq_invalid_rows"] == 3.0
+    assert metrics["dq_out_of_range_wind_direction"] == 1.0
+
+    # Date/Time is left parsed for prepare_data
+    assert pd.api.types.is_datetime64_any_dtype(valid["Date/Time"])
+
+
+def test_validate_data_fail_policy_raises():
+    # Test case where the fail policy rejects data with any invalid row
+    with pytest.raises(ValueError, match="3 of 4 rows invalid"):
+        validate_data(_raw(), mode="train", policy="fail")
+
+
+def test_validate_data_clean_data_is_not_copied():
+    # Test case where clean data passes through without a filtering copy
+    df = _raw().iloc[:1].copy()
+    valid, invalid, report = validate_data(df, mode="train")
+
+    assert valid is df and invalid.empty and report.invalid_rows == 0
+
+
+def test_validate_data_chunked_clean_data_is_not_copied():
+    # Test case where chunked validation of clean data parses the frame in place
+    df = pd.concat([_raw().iloc[:1]] * 5, ignore_index=True)
+    valid, _, report = validate_data(df, mode="train", chunksize=2)
+
+    assert valid is df and report.rows == 5
+    assert pd.api.types.is_datetime64_any_dtype(df["Date/Time"])
+
+
+def test_validate_data_score_mode_without_target():
+    # Test case where the target column is optional when scoring
+    df = _raw().drop(columns="LV ActivePower (kW)")
+    valid, _, _ = validate_data(df, mode="score", policy="drop")
+
+    assert len(valid) == 1
+    with pytest.raises(ValueError):
+        validate_data(_raw().drop(columns="LV ActivePower (kW)"), mode="train")
+
+
+@patch("pipelines.validation.publish_data")
+def test_data_validator_quarantines_invalid_rows(mock_publish):
+    # Test case where the quarantine policy publishes the invalid rows
+    validator = DataValidator(mode="train", policy="quarantine", bucket_name="bucket")
+    valid = validator(_raw())
+
+    assert len(valid) == 1
+    quarantined, bucket = mock_publish.call_args.args
+    assert len(quarantined) == 3 and bucket == "bucket"
+    assert mock_publish.call_args.kwargs["file_name"].startswith("quarantine/data-")
+    assert validator.metrics()["dq_rows"] == 4.0
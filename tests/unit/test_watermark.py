@@ -0,0 +1,66 @@
+import pandas as pd
+
+from pipelines.watermark import filter_new_rows, read_watermark, write_watermark
+
+
+def test_filter_new_rows_without_watermark():
+    # Test case where no watermark exists yet, so every row is new
+    df = pd.DataFrame({"Date/Time": ["01 03 2018 00:00", "01 03 2018 00:10"], "x": [1, 2]})
+
+    new_rows, watermark = filter_new_rows(df, None)
+
+    assert len(new_rows) == 2
+    assert watermark == pd.Timestamp("2018-03-01 00:10")
+
+
+def test_filter_new_rows_after_watermark():
+    # Test case where only rows strictly after the watermark are kept
+    df = pd.DataFrame(
+        {"Date/Time": ["01 03 2018 00:00", "01 03 2018 00:10", "01 03 2018 00:20"], "x": [1, 2, 3]}
+    )
+
+    new_rows, watermark = filter_new_rows(df, pd.Timestamp("2018-03-01 00:10"))
+
+    assert new_rows["x"].tolist() == [3]
+    assert watermark == pd.Timestamp("2018-03-01 00:20")
+
+
+def test_filter_new_rows_keeps_unparseable_dates_for_validation():
+    # Test case where a malformed date after the first run is kept, not silently dropped
+    df = pd.DataFrame(
+        {"Date/Time": ["01 03 2018 00:00", "bad date", "01 03 2018 00:20"], "x": [1, 2, 3]}
+    )
+
+    new_rows, watermark = filter_new_rows(df, pd.Timestamp("2018-03-01 00:10"))
+
+    assert new_rows["x"].tolist() == [2, 3]
+    assert new_rows["Date/Time"].tolist() == ["bad date", "01 03 2018 00:20"]
+    assert watermark == pd.Timestamp("2018-03-01 00:20")
+
+
+def test_filter_new_rows_nothing_new():
+    # Test case where the watermark is already past every row
+    df = pd.DataFrame({"Date/Time": ["01 03 2018 00:00"], "x": [1]})
+
+    new_rows, watermark = filter_new_rows(df, pd.Timestamp("2018-03-01 00:00"))
+
+    assert new_rows.empty
+    assert watermark is None
+
+
+def test_watermark_local_round_trip(tmp_path):
+    # Test case where the watermark state is kept on local disk
+    assert read_watermark("test.csv", "unused", store=str(tmp_path)) is None
+
+    write_watermark("test.csv", pd.Timestamp("2018-03-01 00:20"), "unused", store=str(tmp_path))
+
+    assert read_watermark("test.csv", "unused", store=str(tmp_path)) == pd.Timestamp(
+        "2018-03-01 00:20"
+    )
+
+
+def test_watermark_without_timestamp_round_trip(tmp_path):
+    # Test case where only rows without a valid timestamp have been read so far
+    write_watermark("test.csv", None, "unused", store=str(tmp_path), source_position={"offset": 9})
+
+    assert read_watermark("test.csv", "unused", store=str(tmp_path)) is None
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.window_features import (
+    WINDOW_FEATURE_COLUMNS,
+    WindowState,
+    add_window_features,
+)
+
+
+def _series(n, start="2018-03-01"):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Date/Time": pd.date_range(start, periods=n, freq="10min"),
+            "Wind Speed (m/s)": rng.uniform(0, 20, n),
+        }
+    )
+
+
+def test_window_features_match_whole_and_chunked():
+    # Test case where chunked processing reproduces whole-series features exactly
+    df = _series(50)
+    whole = add_window_features(df, WindowState())
+
+    state = WindowState()
+    chunks = [add_window_features(df.iloc[a:b], state) for a, b in [(0, 1), (1, 7), (7, 50)]]
+    chunked = pd.concat(chunks)
+
+    pd.testing.assert_frame_equal(whole[WINDOW_FEATURE_COLUMNS], chunked[WINDOW_FEATURE_COLUMNS])
+
+
+def test_window_features_values():
+    # Test case where lags and rolling statistics follow the preceding rows
+    df = _series(10)
+    out = add_window_features(df, WindowState())
+    speed = df["Wind Speed (m/s)"].to_numpy()
+
+    assert out["Wind Speed Lag 2"].iloc[5] == speed[3]
+    assert out["Wind Speed Rolling Mean 3"].iloc[5] == pytest.approx(speed[3:6].mean())
+    assert out["Wind Speed Rolling Std 6"].iloc[8] == pytest.approx(speed[3:9].std(ddof=1))
+    # The first observation stands in for the missing history
+    assert out["Wind Speed Lag 1"].iloc[0] == speed[0]
+
+
+def test_window_state_round_trip_continues_series():
+    # Test case where the state is persisted between runs, e.g. with a watermark
+    df = _series(20)
+    state = WindowState()
+    add_window_features(df.iloc[:10], state)
+    restored = WindowState.from_dict(state.to_dict())
+
+    resumed = add_window_features(df.iloc[10:], restored)
+    whole = add_window_features(df, WindowState())
+
+    np.testing.assert_array_equal(
+        resumed[WINDOW_FEATURE_COLUMNS].to_numpy(), whole[WINDOW_FEATURE_COLUMNS].to_numpy()[10:]
+    )
+
+
+def test_window_features_reject_out_of_order_chunks():
+    # Test case where a chunk does not continue after the previous one
+    df = _series(10)
+    state = WindowState()
+    add_window_features(df.iloc[5:], state)
+
+    with pytest.raises(ValueError, match="is not after the previous chunk"):
+        add_window_features(df.iloc[:5], state)